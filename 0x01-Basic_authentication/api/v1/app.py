@@ -9,12 +9,18 @@ from flask_cors import (CORS, cross_origin)
 import os
 from api.v1.auth.auth import Auth
 from api.v1.auth.basic_auth import BasicAuth  # Import the BasicAuth class
+from api.v1.auth.path_matcher import PathMatcher
+from api.v1.auth.context import AuthContext
 
 app = Flask(__name__)
 app.register_blueprint(app_views)
 CORS(app, resources={r"/api/v1/*": {"origins": "*"}})
 auth = None
 AUTH_TYPE = getenv('AUTH_TYPE')
+# paths served without authentication, compiled once
+EXCLUDED_PATHS = PathMatcher(['/api/v1/status/',
+                              '/api/v1/unauthorized/',
+                              '/api/v1/forbidden/'])
 
 if AUTH_TYPE == "auth":
     from api.v1.auth.auth import Auth
@@ -24,6 +30,13 @@ elif AUTH_TYPE == "basic_auth":
     auth = BasicAuth()
 
 
+@app.errorhandler(400)
+def bad_request(error) -> str:
+    """ Bad request handler
+    """
+    return jsonify({"error": "Bad request"}), 400
+
+
 @app.errorhandler(404)
 def not_found(error) -> str:
     """ Not found handler
@@ -64,22 +77,22 @@ def before_request() -> str:
         Return:
             String or nothing
     """
+    # the user is resolved once, on first use, by this hook or a view
+    request.auth_context = AuthContext(auth, request)
     if auth is None:
         return
 
-    expath = ['/api/v1/status/',
-              '/api/v1/unauthorized/',
-              '/api/v1/forbidden/']
-
-    if not (auth.require_auth(request.path, expath)):
+    if not (auth.require_auth(request.path, EXCLUDED_PATHS)):
         return
 
     if (auth.authorization_header(request)) is None:
         abort(401)
 
-    if (auth.current_user(request)) is None:
+    if (request.auth_context.user) is None:
         abort(403)
 
+    request.current_user = request.auth_context.user
+
 
 if __name__ == "__main__":
     host = getenv("API_HOST", "0.0.0.0")
@@ -1,27 +1,34 @@
 from typing import List, TypeVar
 from flask import request
+from api.v1.auth.path_matcher import PathMatcher, compile_paths
 
 class Auth:
+    # name of the scheme authenticating the users, None for none
+    scheme = None
+
     def require_auth(self, path: str, excluded_paths: List[str]) -> bool:
         """
         Check if authentication is required for the given path.
 
         Args:
             path (str): The path to check.
-            excluded_paths (List[str]): List of paths to exclude from authentication.
+            excluded_paths (List[str]): List of paths to exclude from
+                authentication, ideally a PathMatcher compiled once. A
+                path ending with "*" excludes every path starting with
+                what precedes the "*", any other one excludes a path with
+                or without a trailing slash.
 
         Returns:
             bool: True if authentication is required, False if it is excluded.
         """
         if path is None or excluded_paths is None or not excluded_paths:
             return True
-        
-        for excluded_path in excluded_paths:
-            # Check if the path starts with an excluded path (ignoring trailing slashes)
-            if path.startswith(excluded_path.rstrip('/')):
-                return False
 
-        return True
+        # Compile the excluded paths once if the caller didn't do it
+        if type(excluded_paths) is not PathMatcher:
+            excluded_paths = compile_paths(tuple(excluded_paths))
+
+        return not excluded_paths.match(path)
 
     def authorization_header(self, request=None) -> str:
         """
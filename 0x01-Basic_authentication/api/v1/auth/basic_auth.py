@@ -1,29 +1,19 @@
 # api/v1/auth/basic_auth.py
 
 from api.v1.auth.auth import Auth
+from api.v1.auth.credential_cache import CredentialCache
+from api.v1.auth.throttle import THROTTLE, keys_of
 import base64
 from models.user import User
 from typing import TypeVar
-from typing import List
 
-class Auth:
-    def require_auth(self, path: str, excluded_paths: List[str]) -> bool:
-        # Return True if path is None or excluded_paths is None/empty
-        if path is None or excluded_paths is None or not excluded_paths:
-            return True
-
-        # Check if the path matches any excluded path with wildcards
-        for excluded_path in excluded_paths:
-            if excluded_path.endswith('*') and path.startswith(excluded_path[:-1]):
-                return False
-
-            # Check if the path is an exact match (slash-tolerant)
-            if path.rstrip('/') == excluded_path.rstrip('/'):
-                return False
+class BasicAuth(Auth):
+    scheme = "basic"
 
-        return True
+    # Users of the Authorization headers verified recently, shared by
+    # every instance
+    cache = CredentialCache(User.get)
 
-class BasicAuth(Auth):
     def extract_base64_authorization_header(self, authorization_header: str) -> str:
         # Return None for invalid or missing authorization headers
         if (
@@ -94,6 +84,8 @@ class BasicAuth(Auth):
         if not user.is_valid_password(user_pwd):
             return None
 
+        # Rehash the password if its hash doesn't follow the current policy
+        user.upgrade_password(user_pwd)
         return user
 
     def current_user(self, request=None) -> TypeVar('User'):
@@ -108,6 +100,11 @@ class BasicAuth(Auth):
         if auth_header is None:
             return None
 
+        # Return the user of a header verified recently, if unchanged
+        user = self.cache.get(auth_header)
+        if user is not None:
+            return user
+
         # Extract and decode the Base64 part of the authorization header
         decoded_auth_header = self.decode_base64_authorization_header(auth_header)
 
@@ -117,9 +114,26 @@ class BasicAuth(Auth):
 
         # Extract user credentials from the decoded authorization header
         user_email, user_pwd = self.extract_user_credentials(decoded_auth_header)
+        if user_email is None:
+            return None
+
+        # Refuse the attempt, before any lookup or hashing, if this IP or
+        # email failed too often
+        keys = keys_of(request.remote_addr, user_email)
+        if not THROTTLE.allow(*keys):
+            return None
 
         # Return the User instance based on the extracted credentials
-        return self.user_object_from_credentials(user_email, user_pwd)
+        user = self.user_object_from_credentials(user_email, user_pwd)
+        if user is None:
+            THROTTLE.failure(*keys)
+            return None
+        self.cache.put(auth_header, user)
+        return user
+
+    def cache_stats(self) -> dict:
+        # Return the hit/miss metrics of the verified-credential cache
+        return self.cache.stats()
 # For testing the method
 if __name__ == "__main__":
     import uuid
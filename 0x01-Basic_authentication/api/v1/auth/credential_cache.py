@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+""" Cache of the Authorization headers verified recently
+"""
+from collections import OrderedDict
+from os import getenv
+from threading import Lock
+from typing import Callable, TypeVar
+import hashlib
+import hmac
+import os
+import time
+
+# headers kept, least recently used dropped first ("0" disables the cache)
+CACHE_SIZE = int(getenv('AUTH_CACHE_SIZE', '10000'))
+# seconds a verified header is trusted without checking it again
+CACHE_TTL = float(getenv('AUTH_CACHE_TTL', '60'))
+
+
+def fingerprint(user: TypeVar('User')) -> tuple:
+    """ Return what a cached header depends on in a user record: a new
+    email, password or any save of the record drops the entry
+    """
+    return (user.email, user.password, user.updated_at)
+
+
+class CredentialCache():
+    """ Bounded TTL/LRU cache of user ids by Authorization header
+
+    Headers are only kept as an HMAC-SHA256 digest under a random key
+    of the process, never as the cleartext credentials. An entry holds
+    the fingerprint() of the user when the header was verified, and is
+    dropped on a hit once the stored user doesn't match it anymore:
+    changing the password, the email, saving or removing the user all
+    invalidate the headers verified before.
+    """
+
+    def __init__(self, get_user: Callable[[str], object],
+                 size: int = CACHE_SIZE, ttl: float = CACHE_TTL):
+        """ Initialize an empty cache of the users found by get_user(id)
+        """
+        self.get_user = get_user
+        self.size = size
+        self.ttl = ttl
+        self._key = os.urandom(32)
+        self._entries = OrderedDict()
+        self._lock = Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def _digest(self, header: str) -> bytes:
+        """ Return the keyed digest standing for header
+        """
+        return hmac.new(self._key, header.encode('utf-8', 'surrogatepass'),
+                        hashlib.sha256).digest()
+
+    def get(self, header: str) -> TypeVar('User'):
+        """ Return the user header was verified for, or None when it
+        must be verified again
+        """
+        if self.size <= 0:
+            return None
+        digest = self._digest(header)
+        with self._lock:
+            entry = self._entries.get(digest)
+            if entry is None:
+                self.misses += 1
+                return None
+            user_id, user_fingerprint, expires = entry
+            if expires <= time.monotonic():
+                del self._entries[digest]
+                self.evictions += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(digest)
+        user = self.get_user(user_id)
+        with self._lock:
+            if user is None or fingerprint(user) != user_fingerprint:
+                if self._entries.get(digest) is entry:
+                    del self._entries[digest]
+                self.invalidations += 1
+                self.misses += 1
+                return None
+            self.hits += 1
+        return user
+
+    def put(self, header: str, user: TypeVar('User')):
+        """ Remember that header was verified for user
+        """
+        if self.size <= 0:
+            return
+        digest = self._digest(header)
+        entry = (user.id, fingerprint(user), time.monotonic() + self.ttl)
+        with self._lock:
+            self._entries[digest] = entry
+            self._entries.move_to_end(digest)
+            while len(self._entries) > self.size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        """ Forget every verified header
+        """
+        with self._lock:
+            self.invalidations += len(self._entries)
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        """ Return the hit, miss, eviction and invalidation counts, and
+        the number of headers cached
+        """
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses,
+                    "evictions": self.evictions,
+                    "invalidations": self.invalidations,
+                    "size": len(self._entries)}
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+""" Excluded paths of Auth.require_auth, compiled once
+"""
+from functools import lru_cache
+from typing import Iterable, Tuple
+
+
+def normalize(path: str) -> str:
+    """ Return path without its trailing slashes, "/" for the root
+    """
+    return path.rstrip('/') or '/'
+
+
+class PathMatcher(tuple):
+    """ Tuple of excluded path patterns, matched in constant time
+
+    A pattern ending with "*" matches every path starting with what
+    precedes the "*"; any other pattern matches one path, with or
+    without a trailing slash: "/api/v1/status" and "/api/v1/status/"
+    both match "/api/v1/status/" and "/api/v1/status".
+
+    Exact patterns are a set lookup. Prefixes are looked up by the
+    length of each distinct prefix, a handful whatever their number.
+    """
+
+    def __new__(cls, patterns: Iterable[str]):
+        """ Compile patterns
+        """
+        matcher = super().__new__(cls, patterns)
+        matcher._exact = set()
+        matcher._prefixes = set()
+        for pattern in matcher:
+            if pattern.endswith('*'):
+                matcher._prefixes.add(pattern[:-1])
+            else:
+                matcher._exact.add(normalize(pattern))
+        matcher._lengths = sorted({len(prefix)
+                                   for prefix in matcher._prefixes})
+        return matcher
+
+    def match(self, path: str) -> bool:
+        """ Tell whether path matches one of the patterns
+        """
+        if normalize(path) in self._exact:
+            return True
+        prefixes = self._prefixes
+        size = len(path)
+        for length in self._lengths:
+            if length > size:
+                break
+            if path[:length] in prefixes:
+                return True
+        return False
+
+
+@lru_cache(maxsize=128)
+def compile_paths(patterns: Tuple[str, ...]) -> PathMatcher:
+    """ Return the PathMatcher of patterns, compiled once per tuple
+    """
+    return PathMatcher(patterns)
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+""" Benchmark of the requests/s of GET /api/v1/users/<id> with Basic
+authentication, without (AUTH_CACHE_SIZE=0) and with the cache of the
+verified credentials
+"""
+import base64
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+USERS = 10000
+REQUESTS = 5000
+# distinct clients, each one sending the same header over and over
+CLIENTS = 50
+
+
+def child():
+    """ Print the requests/s, the failed requests and the cache stats
+    """
+    from models.user import User
+    users = []
+    for i in range(USERS):
+        user = User(email="user{}@hbtn.io".format(i))
+        # only the users of the clients log in: the others share a hash
+        if i <= CLIENTS:
+            user.password = "pwd{}".format(i)
+        else:
+            user._password = users[CLIENTS].password
+        users.append(user)
+    User.save_many(users)
+
+    from api.v1.app import app, auth
+    client = app.test_client()
+    headers = []
+    for i in range(CLIENTS):
+        credentials = "user{}@hbtn.io:pwd{}".format(i, i).encode()
+        headers.append((users[i].id, {"Authorization": "Basic " +
+                                      base64.b64encode(credentials).decode()}))
+    failed = 0
+    start = time.perf_counter()
+    for i in range(REQUESTS):
+        user_id, header = headers[i % CLIENTS]
+        response = client.get("/api/v1/users/{}".format(user_id),
+                              headers=header)
+        if response.status_code != 200:
+            failed += 1
+    elapsed = time.perf_counter() - start
+    stats = auth.cache_stats()
+    print("{:.0f} {} {} {}".format(REQUESTS / elapsed, failed,
+                                   stats["hits"], stats["misses"]))
+
+
+if __name__ == "__main__":
+    if len(sys.argv) == 2 and sys.argv[1] == "--child":
+        child()
+        sys.exit(0)
+
+    root = os.path.dirname(os.path.abspath(__file__))
+    print("{:>8} {:>10} {:>7} {:>7} {:>7}".format(
+        "cache", "requests/s", "failed", "hits", "misses"))
+    for name, size in (("off", "0"), ("on", "10000")):
+        env = dict(os.environ, PYTHONPATH=root, AUTH_TYPE="basic_auth",
+                   AUTH_CACHE_SIZE=size)
+        out = subprocess.check_output(
+            [sys.executable, os.path.join(root, "bench_basic_auth.py"),
+             "--child"], env=env, cwd=tempfile.mkdtemp()).decode().split()
+        print("{:>8} {:>10} {:>7} {:>7} {:>7}".format(name, *out))
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+""" Benchmark of user imports: one password hash and save() per user
+against set_passwords() and save_many() batches (the size of a POST
+/api/v1/users/bulk), on every backend
+"""
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+BACKENDS = {
+    "json snapshot": {"DB_BACKEND": "json", "DB_STORAGE_MODE": "snapshot"},
+    "json journal": {"DB_BACKEND": "json", "DB_STORAGE_MODE": "journal"},
+    "sqlite": {"DB_BACKEND": "sqlite"},
+}
+# one save() per user is quadratic with snapshots: fewer users for it
+SINGLE_SIZE = 500
+BATCH = 100
+
+
+def child(mode: str, size: int):
+    """ Import size users, print users/s and whether a reload sees them
+    """
+    from models.user import User
+
+    User.load_from_file()
+    users = [User(email="user{}@hbtn.io".format(i)) for i in range(size)]
+    start = time.perf_counter()
+    if mode == "single":
+        for user in users:
+            user.password = "pwd{}".format(user.email)
+            user.save()
+    else:
+        for i in range(0, size, BATCH):
+            batch = users[i:i + BATCH]
+            User.set_passwords(batch, ["pwd{}".format(user.email)
+                                       for user in batch])
+            User.save_many(batch)
+    User.flush()
+    elapsed = time.perf_counter() - start
+    User.load_from_file()
+    print("{:.0f} {}".format(size / elapsed, User.count() == size))
+
+
+if __name__ == "__main__":
+    if len(sys.argv) == 4 and sys.argv[1] == "--child":
+        child(sys.argv[2], int(sys.argv[3]))
+        sys.exit(0)
+
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    root = os.path.dirname(os.path.abspath(__file__))
+    print("{:>14} {:>7} {:>8} {:>9} {:>9}".format(
+        "backend", "mode", "users", "users/s", "reloaded"))
+    for name, backend_env in BACKENDS.items():
+        env = dict(os.environ, PYTHONPATH=root, **backend_env)
+        for mode, count in (("single", SINGLE_SIZE), ("bulk", size)):
+            out = subprocess.check_output(
+                [sys.executable, os.path.join(root, "bench_bulk.py"),
+                 "--child", mode, str(count)], env=env,
+                cwd=tempfile.mkdtemp()).decode().split()
+            print("{:>14} {:>7} {:>8} {:>9} {:>9}".format(
+                name, mode, count, *out))
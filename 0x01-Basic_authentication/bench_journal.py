@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+""" Benchmark of the per-write cost of Base.save() for the snapshot
+and the journal storage modes as the store grows
+"""
+import os
+import sys
+import tempfile
+import time
+
+import models.base as base
+from models.backends import JSONFileBackend
+from models.user import User
+
+SIZES = [int(n) for n in sys.argv[1:]] or [1000, 10000, 100000]
+WRITES = 200
+
+
+def populate(size: int):
+    """ Fill the store with size users and write the initial snapshot
+    """
+    base.DATA['User'] = base.LazyStore(User)
+    # hashing is not what is measured: every user gets the same one
+    hashed = User()
+    hashed.password = "pwd"
+    for i in range(size):
+        user = User(email="user{}@hbtn.io".format(i))
+        user._password = hashed.password
+        base.DATA['User'][user.id] = user
+    User.save_to_file()
+
+
+def time_writes(mode: str) -> float:
+    """ Return the average time in ms of one profile update
+    """
+    base.BACKEND = JSONFileBackend(journal=mode == 'journal')
+    users = list(base.DATA['User'].values())[:WRITES]
+    start = time.perf_counter()
+    for user in users:
+        user.first_name = "Bob"
+        user.save()
+    return (time.perf_counter() - start) * 1000 / len(users)
+
+
+if __name__ == "__main__":
+    os.chdir(tempfile.mkdtemp())
+    print("{:>10} {:>14} {:>14}".format("users", "snapshot ms", "journal ms"))
+    for size in SIZES:
+        populate(size)
+        snapshot = time_writes('snapshot')
+        journal = time_writes('journal')
+        print("{:>10} {:>14.3f} {:>14.3f}".format(size, snapshot, journal))
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+""" Benchmark of the startup time and peak memory of loading
+.db_User.json, eagerly (json.load) and with the streaming lazy loader
+"""
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+
+
+def generate(size: int):
+    """ Write a .db_User.json file of size users in the current folder
+    """
+    with open(".db_User.json", 'w') as f:
+        f.write("{")
+        for i in range(size):
+            obj_id = str(uuid.uuid4())
+            obj = {"id": obj_id, "created_at": "2023-11-06T01:41:07",
+                   "updated_at": "2023-11-06T01:41:07",
+                   "email": "user{}@hbtn.io".format(i),
+                   "_password": uuid.uuid4().hex * 2,
+                   "first_name": None, "last_name": None}
+            f.write("{}{}: {}".format(", " if i else "",
+                                      json.dumps(obj_id), json.dumps(obj)))
+        f.write("}")
+
+
+def child(mode: str):
+    """ Load the file in this process and print the time and peak RSS
+    """
+    from models.base import DATA, TIMESTAMP_FORMAT
+    from models.user import User
+    from datetime import datetime
+
+    start = time.perf_counter()
+    if mode == "eager":
+        # the previous loader: whole document, then every object
+        DATA['User'] = {}
+        with open(".db_User.json", 'r') as f:
+            for obj_id, obj_json in json.load(f).items():
+                obj = User(**obj_json)
+                obj.created_at = datetime.strptime(obj_json['created_at'],
+                                                   TIMESTAMP_FORMAT)
+                obj.updated_at = datetime.strptime(obj_json['updated_at'],
+                                                   TIMESTAMP_FORMAT)
+                DATA['User'][obj_id] = obj
+    else:
+        User.load_from_file()
+        User.get(next(iter(DATA['User'].keys())))
+    elapsed = time.perf_counter() - start
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print("{:.2f} {:.0f}".format(elapsed, peak))
+
+
+if __name__ == "__main__":
+    if len(sys.argv) == 3 and sys.argv[1] == "--child":
+        child(sys.argv[2])
+        sys.exit(0)
+
+    sizes = [int(n) for n in sys.argv[1:]] or [100000, 1000000]
+    root = os.path.dirname(os.path.abspath(__file__))
+    env = dict(os.environ, PYTHONPATH=root)
+    os.chdir(tempfile.mkdtemp())
+    print("{:>9} {:>7} {:>9} {:>12}".format("users", "loader", "start s",
+                                            "peak RSS MB"))
+    for size in sizes:
+        generate(size)
+        for mode in ("eager", "lazy"):
+            out = subprocess.check_output(
+                [sys.executable, os.path.join(root, "bench_loader.py"),
+                 "--child", mode], env=env).decode().split()
+            print("{:>9} {:>7} {:>9} {:>12}".format(size, mode, *out))
@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+""" Benchmark of the memory used per User object, with the default
+__dict__ layout and with DB_COMPACT_OBJECTS=1 (__slots__)
+"""
+import os
+import subprocess
+import sys
+import tracemalloc
+import uuid
+
+
+def child(size: int):
+    """ Build size users as load_from_file() does and print the
+    number of bytes allocated per user
+    """
+    from models.user import User
+
+    records = [{"id": str(uuid.uuid4()), "created_at": "2023-11-06T01:41:07",
+                "updated_at": "2023-11-06T01:41:07",
+                "email": "user{}@hbtn.io".format(i),
+                "_password": uuid.uuid4().hex * 2,
+                "first_name": "Bob", "last_name": "Dylan"}
+               for i in range(size)]
+    tracemalloc.start()
+    users = [User(**record) for record in records]
+    allocated = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    assert users[0].to_json(True) == records[0]
+    print("{:.0f}".format(allocated / size))
+
+
+if __name__ == "__main__":
+    if len(sys.argv) == 3 and sys.argv[1] == "--child":
+        child(int(sys.argv[2]))
+        sys.exit(0)
+
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    root = os.path.dirname(os.path.abspath(__file__))
+    print("{:>9} {:>8} {:>15}".format("users", "compact", "bytes per user"))
+    for compact in ("0", "1"):
+        env = dict(os.environ, PYTHONPATH=root, DB_COMPACT_OBJECTS=compact)
+        out = subprocess.check_output(
+            [sys.executable, os.path.join(root, "bench_memory.py"),
+             "--child", str(size)], env=env).decode().strip()
+        print("{:>9} {:>8} {:>15}".format(size, compact, out))
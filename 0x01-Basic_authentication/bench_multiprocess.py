@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+""" Multi-process write stress test of the Base store (DB_MULTIPROCESS=1)
+
+Every worker process creates users, updates and removes some of them,
+then waits for the others and checks it sees all their changes without
+reloading the store; a last fresh load checks what is on disk.
+"""
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+PROCESSES = 4
+WRITES = 500
+
+
+def expected_emails() -> set:
+    """ Return the emails left once every worker is done
+    """
+    return {"p{}-{}@hbtn.io".format(p, i)
+            for p in range(PROCESSES) for i in range(WRITES) if i % 4 != 0}
+
+
+def child(worker: int):
+    """ Run one worker and print "ok" or the mismatch it found
+    """
+    from models.user import User
+
+    User.load_from_file()
+    for i in range(WRITES):
+        user = User(email="p{}-{}@hbtn.io".format(worker, i))
+        user.save()
+        if i % 4 == 0:
+            user.remove()
+        elif i % 4 == 1:
+            user.first_name = "Worker {}".format(worker)
+            user.save()
+    User.flush()
+
+    open("done.{}".format(worker), 'w').close()
+    while not all(os.path.exists("done.{}".format(p))
+                  for p in range(PROCESSES)):
+        time.sleep(0.01)
+
+    emails = {user.email for user in User.all()}
+    other = (worker + 1) % PROCESSES
+    found = User.search({"email": "p{}-1@hbtn.io".format(other)})
+    if emails != expected_emails():
+        print("{} users instead of {}".format(len(emails),
+                                              len(expected_emails())))
+    elif len(found) != 1 or found[0].first_name != "Worker {}".format(other):
+        print("update of worker {} not seen".format(other))
+    else:
+        print("ok")
+
+
+def check_on_disk() -> bool:
+    """ Load the store from scratch and compare it to the expectation
+    """
+    from models.user import User
+
+    User.load_from_file()
+    return {user.email for user in User.all()} == expected_emails()
+
+
+if __name__ == "__main__":
+    if len(sys.argv) == 3 and sys.argv[1] == "--child":
+        child(int(sys.argv[2]))
+        sys.exit(0)
+    if len(sys.argv) == 2 and sys.argv[1] == "--check":
+        print(check_on_disk())
+        sys.exit(0)
+
+    root = os.path.dirname(os.path.abspath(__file__))
+    script = os.path.join(root, "bench_multiprocess.py")
+    for backend in ("json", "sqlite"):
+        for durability in ("sync", "interval"):
+            cwd = tempfile.mkdtemp()
+            env = dict(os.environ, PYTHONPATH=root, DB_MULTIPROCESS="1",
+                       DB_BACKEND=backend, DB_DURABILITY=durability,
+                       DB_FLUSH_INTERVAL="0.05")
+            start = time.perf_counter()
+            workers = [subprocess.Popen([sys.executable, script, "--child",
+                                         str(p)], env=env, cwd=cwd,
+                                        stdout=subprocess.PIPE)
+                       for p in range(PROCESSES)]
+            results = [w.communicate()[0].decode().strip() for w in workers]
+            elapsed = time.perf_counter() - start
+            on_disk = subprocess.check_output(
+                [sys.executable, script, "--check"], env=env,
+                cwd=cwd).decode().strip()
+            print("{:>6} {:>8}: {} processes x {} writes in {:.2f} s, "
+                  "workers {}, on disk {}".format(
+                      backend, durability, PROCESSES, WRITES * 7 // 4,
+                      elapsed, results, on_disk))
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+""" Benchmark of the restart time of a Base store from a JSON and from a
+binary snapshot, and of save() latency while a compaction runs
+"""
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+
+WRITES = 2000
+
+
+def generate(size: int):
+    """ Write .db_User.json and .db_User.bin snapshots of size users in
+    the current folder
+    """
+    from models.backends import JSONFileBackend
+
+    records = []
+    for i in range(size):
+        obj_id = str(uuid.uuid4())
+        records.append((obj_id, json.dumps({
+            "id": obj_id, "created_at": "2023-11-06T01:41:07",
+            "updated_at": "2023-11-06T01:41:07",
+            "email": "user{}@hbtn.io".format(i),
+            "_password": uuid.uuid4().hex * 2,
+            "first_name": None, "last_name": None})))
+    for binary in (False, True):
+        os.makedirs("bin" if binary else "json", exist_ok=True)
+        os.chdir("bin" if binary else "json")
+        JSONFileBackend(binary=binary).dump("User", records)
+        os.chdir("..")
+
+
+def child_restart():
+    """ Load the store, then build every object, printing both times
+    """
+    from models.user import User
+
+    start = time.perf_counter()
+    User.load_from_file()
+    loaded = time.perf_counter() - start
+    User.all()
+    print("{:.2f} {:.2f}".format(loaded, time.perf_counter() - start))
+
+
+def child_compaction():
+    """ Print the p99 save() latency in ms without, then during, a
+    compaction of the journal
+    """
+    from models.user import User
+
+    User.load_from_file()
+    users = User.all()[:WRITES]
+    p99 = []
+    for compacting in (False, True):
+        if compacting:
+            thread = User.compact()
+        latencies = []
+        for user in users:
+            start = time.perf_counter()
+            user.first_name = "Bob"
+            user.save()
+            latencies.append(time.perf_counter() - start)
+        latencies.sort()
+        p99.append(latencies[len(latencies) * 99 // 100] * 1000)
+    thread.join()
+    print("{:.3f} {:.3f}".format(*p99))
+
+
+if __name__ == "__main__":
+    if len(sys.argv) == 3 and sys.argv[1] == "--child":
+        if sys.argv[2] == "restart":
+            child_restart()
+        else:
+            child_compaction()
+        sys.exit(0)
+
+    sizes = [int(n) for n in sys.argv[1:]] or [100000]
+    root = os.path.dirname(os.path.abspath(__file__))
+    script = os.path.join(root, "bench_snapshot.py")
+    sys.path.insert(0, root)
+    os.chdir(tempfile.mkdtemp())
+    print("{:>9} {:>7} {:>8} {:>11} {:>13} {:>16}".format(
+        "users", "format", "load s", "all objs s", "save p99 ms",
+        "compacting p99"))
+    for size in sizes:
+        generate(size)
+        for fmt in ("json", "bin"):
+            env = dict(os.environ, PYTHONPATH=root, DB_STORAGE_MODE="journal",
+                       DB_COMPACT_SIZE="0",
+                       DB_SNAPSHOT_FORMAT="binary" if fmt == "bin" else "json")
+            restart = subprocess.check_output(
+                [sys.executable, script, "--child", "restart"],
+                env=env, cwd=fmt).decode().split()
+            compaction = subprocess.check_output(
+                [sys.executable, script, "--child", "compaction"],
+                env=env, cwd=fmt).decode().split()
+            print("{:>9} {:>7} {:>8} {:>11} {:>13} {:>16}".format(
+                size, fmt, *restart, *compaction))
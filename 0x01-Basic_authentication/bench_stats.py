@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+""" Benchmark of User.stats(), maintained on every change, against the
+same numbers computed by scanning all users, for several store sizes
+"""
+import os
+import sys
+import tempfile
+import time
+
+POLLS = 100
+
+
+def scan(users: list) -> dict:
+    """ Compute the User statistics from all users
+    """
+    per_day = {}
+    named = 0
+    for user in users:
+        day = user.created_at.strftime("%Y-%m-%d")
+        per_day[day] = per_day.get(day, 0) + 1
+        if user.first_name or user.last_name:
+            named += 1
+    return {"created_per_day": per_day,
+            "with_name": {True: named, False: len(users) - named}}
+
+
+if __name__ == "__main__":
+    sizes = [int(n) for n in sys.argv[1:]] or [1000, 10000, 100000]
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    os.chdir(tempfile.mkdtemp())
+    from models.user import User
+
+    print("{:>9} {:>15} {:>12} {:>6}".format(
+        "users", "scan ms/poll", "stats ms/poll", "same"))
+    users = []
+    for size in sizes:
+        batch = []
+        for i in range(len(users), size):
+            user = User(email="user{}@hbtn.io".format(i))
+            if i % 3 == 0:
+                user.first_name = "Bob"
+            batch.append(user)
+        User.save_many(batch)
+        users.extend(batch)
+        User.flush()
+
+        start = time.perf_counter()
+        for _ in range(POLLS):
+            scanned = scan(User.all())
+        scan_ms = (time.perf_counter() - start) * 1000 / POLLS
+        # the first poll counts the users once, later ones read counters
+        User.stats()
+        start = time.perf_counter()
+        for _ in range(POLLS):
+            stats = User.stats()
+        stats_ms = (time.perf_counter() - start) * 1000 / POLLS
+        print("{:>9} {:>15.3f} {:>12.4f} {:>6}".format(
+            size, scan_ms, stats_ms, str(stats == scanned)))
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+""" Multi-threaded read/write benchmark of the Base store: reader
+threads scan, search and query while writer threads create, update and
+remove users; prints the throughput, the errors met, and checks the
+store and its indexes agree at the end
+"""
+import os
+import sys
+import tempfile
+import threading
+import time
+
+os.environ.setdefault("DB_STORAGE_MODE", "journal")
+os.environ.setdefault("DB_DURABILITY", "interval")
+
+SIZE = 10000
+DURATION = 5.0
+
+
+def reader(counts: list, errors: list, stop: threading.Event):
+    """ Scan, search and query the store until stop is set
+    """
+    from models.user import User
+
+    i = 0
+    while not stop.is_set():
+        try:
+            users = User.all()
+            if len({user.id for user in users}) != len(users):
+                errors.append("duplicate id in all()")
+            User.search({"email": "user{}@hbtn.io".format(i % SIZE)})
+            User.query({"email": {"prefix": "user1"}}, order_by="email",
+                       limit=10)
+            User.page(limit=100)
+        except Exception as e:
+            errors.append(repr(e))
+        counts[0] += 1
+        i += 1
+
+
+def writer(worker: int, counts: list, errors: list, stop: threading.Event):
+    """ Create, update and remove users until stop is set
+    """
+    from models.user import User
+
+    i = 0
+    while not stop.is_set():
+        try:
+            user = User(email="w{}-{}@hbtn.io".format(worker, i))
+            user.save()
+            user.first_name = "Bob"
+            user.save()
+            if i % 2 == 0:
+                user.remove()
+        except Exception as e:
+            errors.append(repr(e))
+        counts[0] += 1
+        i += 1
+
+
+def check() -> list:
+    """ Return the disagreements between the store and its indexes
+    """
+    from models.base import DATA
+    from models.user import User
+
+    problems = []
+    ids = sorted(obj_id for obj_id, _ in DATA['User'].snapshot())
+    if [user.id for user in User.page()] != ids:
+        problems.append("id index differs from the store")
+    for user in User.all():
+        if User.search({"email": user.email}) != [user]:
+            problems.append("hash index misses {}".format(user.email))
+        if User.query({"email": user.email}, order_by="email") != [user]:
+            problems.append("email index misses {}".format(user.email))
+    return problems
+
+
+if __name__ == "__main__":
+    threads_count = int(sys.argv[1]) if len(sys.argv) > 1 else 8
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    os.chdir(tempfile.mkdtemp())
+    from models.user import User
+
+    User.load_from_file()
+    for i in range(SIZE):
+        User(email="user{}@hbtn.io".format(i)).save()
+    User.flush()
+
+    stop = threading.Event()
+    errors = []
+    reads = [[0] for _ in range(threads_count // 2)]
+    writes = [[0] for _ in range(threads_count - threads_count // 2)]
+    threads = [threading.Thread(target=reader, args=(c, errors, stop))
+               for c in reads]
+    threads += [threading.Thread(target=writer, args=(i, c, errors, stop))
+                for i, c in enumerate(writes)]
+    for thread in threads:
+        thread.start()
+    time.sleep(DURATION)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    User.flush()
+
+    print("{} readers: {:.0f} reads/s".format(
+        len(reads), sum(c[0] for c in reads) / DURATION))
+    print("{} writers: {:.0f} writes/s".format(
+        len(writes), sum(c[0] for c in writes) / DURATION))
+    print("errors: {}".format(sorted(set(errors)) or "none"))
+    print("index problems: {}".format(check() or "none"))
+    expected = User.count()
+    User.load_from_file()
+    print("reloaded count matches: {}".format(User.count() == expected))
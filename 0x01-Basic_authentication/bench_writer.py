@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+""" Benchmark of save() latency under concurrent writers for each
+DB_DURABILITY level (sync, group, interval)
+"""
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+THREADS = 8
+WRITES = 50
+
+
+def child(size: int):
+    """ Run THREADS threads saving users and print p50/p99 in ms
+    """
+    import models.base as base
+    from models.user import User
+
+    User.load_from_file()
+    for i in range(size):
+        user = User(email="user{}@hbtn.io".format(i))
+        base.DATA['User'][user.id] = user
+    User.save_to_file()
+    users = list(base.DATA['User'].values())
+    latencies = []
+
+    def work(offset: int):
+        """ Update WRITES users, one save() each
+        """
+        for user in users[offset::THREADS][:WRITES]:
+            start = time.perf_counter()
+            user.first_name = "Bob"
+            user.save()
+            latencies.append(time.perf_counter() - start)
+
+    threads = [threading.Thread(target=work, args=(i,))
+               for i in range(THREADS)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    User.flush()
+    total = time.perf_counter() - start
+    latencies.sort()
+    print("{:.2f} {:.2f} {:.2f}".format(
+        latencies[len(latencies) // 2] * 1000,
+        latencies[len(latencies) * 99 // 100] * 1000, total))
+
+
+if __name__ == "__main__":
+    if len(sys.argv) == 3 and sys.argv[1] == "--child":
+        child(int(sys.argv[2]))
+        sys.exit(0)
+
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    root = os.path.dirname(os.path.abspath(__file__))
+    print("{:>9} {:>9} {:>8} {:>8} {:>9}".format(
+        "users", "durability", "p50 ms", "p99 ms", "total s"))
+    for durability in ("sync", "group", "interval"):
+        env = dict(os.environ, PYTHONPATH=root, DB_DURABILITY=durability)
+        out = subprocess.check_output(
+            [sys.executable, os.path.join(root, "bench_writer.py"),
+             "--child", str(size)], env=env, cwd=tempfile.mkdtemp())
+        print("{:>9} {:>9} {:>8} {:>8} {:>9}".format(
+            size, durability, *out.decode().split()))
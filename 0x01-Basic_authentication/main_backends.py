@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+""" Main backends: run the same Base scenario on every storage backend
+and check that they all give the same results
+"""
+import os
+import subprocess
+import sys
+import tempfile
+
+BACKENDS = {
+    "json snapshot": {"DB_BACKEND": "json", "DB_STORAGE_MODE": "snapshot"},
+    "json journal": {"DB_BACKEND": "json", "DB_STORAGE_MODE": "journal"},
+    "sqlite": {"DB_BACKEND": "sqlite"},
+}
+
+
+def scenario():
+    """ Exercise all(), get(), search(), count(), save() and remove(),
+    reloading from the backend between steps
+    """
+    from models.user import User
+
+    User.load_from_file()
+    users = []
+    for i in range(3):
+        user = User(id="id{}".format(i), email="bob{}@hbtn.io".format(i))
+        user.password = "pwd{}".format(i)
+        user.save()
+        users.append(user)
+    users[1].first_name = "Bob"
+    users[1].save()
+    users[2].remove()
+    print(User.count(), sorted(u.id for u in User.all()))
+
+    User.load_from_file()
+    print(User.count(), sorted(u.id for u in User.all()))
+    print(User.get("id1").display_name(), User.get("id2"))
+    print([u.id for u in User.search({"email": "bob0@hbtn.io"})])
+    print([u.id for u in User.search({"first_name": "Bob"})])
+    print(User.get("id0").is_valid_password("pwd0"))
+
+
+if __name__ == "__main__":
+    if len(sys.argv) == 2 and sys.argv[1] == "--child":
+        scenario()
+        sys.exit(0)
+
+    root = os.path.dirname(os.path.abspath(__file__))
+    outputs = {}
+    for name, backend_env in BACKENDS.items():
+        env = dict(os.environ, PYTHONPATH=root, **backend_env)
+        outputs[name] = subprocess.check_output(
+            [sys.executable, os.path.join(root, "main_backends.py"),
+             "--child"], env=env, cwd=tempfile.mkdtemp()).decode()
+        print("{}:\n{}".format(name, outputs[name]))
+    print("Same results: {}".format(len(set(outputs.values())) == 1))
@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+""" Main cursor: page through GET /api/v1/users with the next cursors,
+and check that malformed cursors are rejected with 400 instead of being
+read as the first page
+"""
+import os
+import tempfile
+
+MALFORMED = ("@@@", "", "=", "aWQx!", "aWQ x", "_w==", "é")
+
+
+if __name__ == "__main__":
+    os.environ.pop("AUTH_TYPE", None)
+    os.chdir(tempfile.mkdtemp())
+    from api.v1.app import app
+    from api.v1.views.users import encode_cursor
+    from models.user import User
+
+    for i in range(5):
+        User(id="id{}".format(i), email="bob{}@hbtn.io".format(i)).save()
+
+    client = app.test_client()
+    ids = []
+    cursor = None
+    while True:
+        query = {"limit": 2}
+        if cursor is not None:
+            query["cursor"] = cursor
+        page = client.get("/api/v1/users", query_string=query).get_json()
+        ids.extend(user["id"] for user in page["users"])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+    print("pages:", ids)
+    assert ids == ["id{}".format(i) for i in range(5)]
+
+    for cursor in MALFORMED:
+        response = client.get("/api/v1/users",
+                              query_string={"cursor": cursor})
+        print("cursor {!r}: {} {}".format(cursor, response.status_code,
+                                          response.get_json()))
+        assert response.status_code == 400
+
+    response = client.get("/api/v1/users",
+                          query_string={"cursor": encode_cursor("id2")})
+    print("cursor of id2:", [user["id"]
+                             for user in response.get_json()["users"]])
+    assert response.status_code == 200
+    print("OK")
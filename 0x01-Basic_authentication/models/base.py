@@ -1,40 +1,258 @@
 #!/usr/bin/env python3
 """ Base module
 """
+from contextlib import contextmanager
 from datetime import datetime
-from typing import TypeVar, List, Iterable
-from os import path
+from typing import Callable, TypeVar, List, Iterable
+from os import getenv
+import gc
 import json
+import threading
 import uuid
 
+from models.backends import JSONFileBackend, SQLiteBackend
+from models.index import HashIndex, OrderedIndex, attribute_value, sort_key
+from models.stats import Counter
+from models.writer import BackgroundWriter
+
 
 TIMESTAMP_FORMAT = "%Y-%m-%dT%H:%M:%S"
 DATA = {}
 
+# "snapshot" rewrites .db_<Class>.json on every write, "journal" appends
+# one record per write to .db_<Class>.log and replays it at startup
+STORAGE_MODE = getenv('DB_STORAGE_MODE', 'snapshot')
+
+# "1" when several processes share the storage: writes are serialized
+# by a lock file and each process picks up the others' changes
+MULTIPROCESS = getenv('DB_MULTIPROCESS', '0') == '1'
+
+# "json" keeps the .db_<Class>.json files above, "sqlite" stores one
+# row per object in the DB_SQLITE_PATH database, with the changes of the
+# last DB_CHANGES_LOG seqs for the other processes
+if getenv('DB_BACKEND', 'json') == 'sqlite':
+    BACKEND = SQLiteBackend(getenv('DB_SQLITE_PATH', '.db.sqlite3'),
+                            multiprocess=MULTIPROCESS,
+                            changes_log=int(getenv('DB_CHANGES_LOG',
+                                                   '10000')))
+else:
+    # "binary" writes the snapshots as .db_<Class>.bin files, faster to
+    # load, with timestamps stored as integers
+    BACKEND = JSONFileBackend(
+        journal=STORAGE_MODE == 'journal', multiprocess=MULTIPROCESS,
+        binary=getenv('DB_SNAPSHOT_FORMAT', 'json') == 'binary')
+
+# size in bytes of the journal from which a write starts a background
+# compact() of its class, 0 to only compact when asked
+COMPACT_SIZE = int(getenv('DB_COMPACT_SIZE', str(64 * 1024 * 1024)))
+# running compaction thread, by class
+COMPACTIONS = {}
+COMPACTIONS_LOCK = threading.Lock()
+
+# "sync" writes inside save()/remove(), "group" hands the write to a
+# background writer and waits for the batch holding it, "interval" only
+# hands it over: the writer flushes every DB_FLUSH_INTERVAL seconds or
+# every DB_FLUSH_BATCH_SIZE writes
+DURABILITY = getenv('DB_DURABILITY', 'sync')
+WRITER = BackgroundWriter(
+    interval=0 if DURABILITY == 'group'
+    else float(getenv('DB_FLUSH_INTERVAL', '1')),
+    batch_size=int(getenv('DB_FLUSH_BATCH_SIZE', '1000')))
+
+# (op, id, JSON text) changes waiting for the background writer, by class
+PENDING_RECORDS = {}
+PENDING_LOCK = threading.Lock()
+
+# "1" gives Base and User __slots__ instead of a per-object __dict__
+COMPACT_OBJECTS = getenv('DB_COMPACT_OBJECTS', '0') == '1'
+
+# secondary indexes of each class, built from its __indexes__ and
+# __ordered_indexes__ attributes, plus an ordered index of the ids and
+# the counters of its __stats__
+INDEXES = {}
+
+# operators of a query() condition besides equality
+QUERY_OPERATORS = ('prefix', 'gt', 'gte', 'lt', 'lte')
+
+
+class LazyStore(dict):
+    """ Objects of one class by id
+
+    Records read from file are kept as their raw JSON dictionary and
+    only built into an object the first time they are accessed.
+
+    Writers hold lock, which Base also holds around the index updates
+    going with a write, so writes of a class are serialized. Readers
+    take no lock: scans go through snapshot(), an immutable copy of
+    the pairs shared until the next write.
+
+    A snapshot is tagged with the version of the store read before
+    copying it, and each write bumps the version after its change: a
+    copy racing with a write is never reused past that write.
+    """
+
+    def __init__(self, cls: type):
+        """ Initialize an empty store of cls objects
+        """
+        super().__init__()
+        self._cls = cls
+        self._version = 0
+        self._snapshot = (-1, ())
+        self.lock = threading.RLock()
+
+    def _build(self, obj_id: str, obj: object) -> TypeVar('Base'):
+        """ Return the object for obj, the value read under obj_id,
+        building it if it is a raw record
+
+        An object built meanwhile by another thread is returned instead
+        of a second one; a record replaced or removed since it was read
+        is built without being stored.
+        """
+        if type(obj) is not dict:
+            return obj
+        current = dict.get(self, obj_id)
+        if current is not obj and current is not None and \
+                type(current) is not dict:
+            return current
+        built = self._cls(**obj)
+        with self.lock:
+            current = dict.get(self, obj_id)
+            if current is obj:
+                dict.__setitem__(self, obj_id, built)
+            elif current is not None and type(current) is not dict:
+                return current
+        return built
+
+    def __getitem__(self, obj_id: str) -> TypeVar('Base'):
+        """ Return one object by ID
+        """
+        return self._build(obj_id, dict.__getitem__(self, obj_id))
+
+    def __setitem__(self, obj_id: str, obj: object):
+        """ Store an object, or a raw record, under obj_id
+        """
+        with self.lock:
+            dict.__setitem__(self, obj_id, obj)
+            self._version += 1
+
+    def __delitem__(self, obj_id: str):
+        """ Remove the object stored under obj_id
+        """
+        with self.lock:
+            dict.__delitem__(self, obj_id)
+            self._version += 1
+
+    def update(self, pairs: Iterable[tuple]):
+        """ Store several (id, object or raw record) pairs
+        """
+        with self.lock:
+            dict.update(self, pairs)
+            self._version += 1
+
+    def pop(self, obj_id: str, *default) -> object:
+        """ Remove and return what is stored under obj_id
+        """
+        with self.lock:
+            obj = dict.pop(self, obj_id, *default)
+            self._version += 1
+            return obj
+
+    def get(self, obj_id: str, default=None) -> TypeVar('Base'):
+        """ Return one object by ID, or default
+        """
+        obj = dict.get(self, obj_id)
+        if obj is None:
+            return default
+        return self._build(obj_id, obj)
+
+    def snapshot(self) -> tuple:
+        """ Return the (id, object or raw record) pairs as of the last
+        write, building nothing
+        """
+        version, snapshot = self._snapshot
+        while version != self._version:
+            version = self._version
+            try:
+                snapshot = tuple(dict.items(self))
+            except RuntimeError:
+                # resized by a writer in the middle of the copy
+                version = -1
+                continue
+            self._snapshot = (version, snapshot)
+        return snapshot
+
+    def values(self) -> Iterable[TypeVar('Base')]:
+        """ Return all objects
+        """
+        return [self._build(k, v) for k, v in self.snapshot()]
+
+    def items(self) -> Iterable[tuple]:
+        """ Return all (id, object) pairs
+        """
+        return [(k, self._build(k, v)) for k, v in self.snapshot()]
+
+    def raw_items(self) -> Iterable[tuple]:
+        """ Return all (id, object or raw record) pairs, building nothing
+        """
+        return self.snapshot()
+
 
 class Base():
     """ Base class
+
+    Subclasses can declare __indexes__, a tuple of attribute names
+    used by search() to find equality matches without a full scan, and
+    __ordered_indexes__, attributes kept sorted for the prefix, range
+    and order_by of query(). __stats__ maps the name of a statistic to
+    the (attributes, key function) of a Counter, reported by stats().
     """
+    __indexes__ = ()
+    __ordered_indexes__ = ()
+    __stats__ = {}
+    if COMPACT_OBJECTS:
+        __slots__ = ('id', 'created_at', 'updated_at', '__json')
 
     def __init__(self, *args: list, **kwargs: dict):
         """ Initialize a Base instance
         """
         s_class = str(self.__class__.__name__)
         if DATA.get(s_class) is None:
-            DATA[s_class] = {}
+            DATA.setdefault(s_class, LazyStore(self.__class__))
 
         self.id = kwargs.get('id', str(uuid.uuid4()))
+        # fromisoformat parses TIMESTAMP_FORMAT far faster than strptime
         if kwargs.get('created_at') is not None:
-            self.created_at = datetime.strptime(kwargs.get('created_at'),
-                                                TIMESTAMP_FORMAT)
+            self.created_at = datetime.fromisoformat(kwargs.get('created_at'))
         else:
             self.created_at = datetime.utcnow()
         if kwargs.get('updated_at') is not None:
-            self.updated_at = datetime.strptime(kwargs.get('updated_at'),
-                                                TIMESTAMP_FORMAT)
+            self.updated_at = datetime.fromisoformat(kwargs.get('updated_at'))
         else:
             self.updated_at = datetime.utcnow()
 
+    def __setattr__(self, name: str, value: object):
+        """ Set an attribute, dropping the cached JSON and keeping the
+        indexes of a stored object up to date
+        """
+        if name != '_Base__json' and self.cached_json() is not None:
+            super().__setattr__('_Base__json', None)
+        s_class = self.__class__.__name__
+        indexes = INDEXES.get(s_class)
+        if indexes:
+            affected = [i for i in indexes if name in i.attributes]
+            obj_id = getattr(self, 'id', None)
+            store = DATA[s_class]
+            if affected and dict.get(store, obj_id) is self:
+                with store.lock:
+                    if dict.get(store, obj_id) is self:
+                        for index in affected:
+                            index.discard(obj_id, self)
+                        super().__setattr__(name, value)
+                        for index in affected:
+                            index.add(obj_id, self)
+                        return
+        super().__setattr__(name, value)
+
     def __eq__(self, other: TypeVar('Base')) -> bool:
         """ Equality
         """
@@ -46,78 +264,521 @@ class Base():
 
     def to_json(self, for_serialization: bool = False) -> dict:
         """ Convert the object a JSON dictionary
+
+        Both forms are cached until an attribute of the object is set.
         """
-        result = {}
-        for key, value in self.__dict__.items():
-            if not for_serialization and key[0] == '_':
-                continue
-            if type(value) is datetime:
-                result[key] = value.strftime(TIMESTAMP_FORMAT)
-            else:
+        cache = self.cached_json()
+        if cache is None:
+            public = {}
+            result = {}
+            for key, value in self.attributes():
+                if type(value) is datetime:
+                    value = value.strftime(TIMESTAMP_FORMAT)
                 result[key] = value
+                if key[0] != '_':
+                    public[key] = value
+            cache = [public, result, None]
+            super().__setattr__('_Base__json', cache)
+        if for_serialization:
+            return dict(cache[1])
+        return dict(cache[0])
+
+    def to_json_text(self) -> str:
+        """ Return the JSON text of to_json(True), cached as well
+        """
+        self.to_json()
+        cache = self.cached_json()
+        if cache[2] is None:
+            cache[2] = json.dumps(cache[1])
+        return cache[2]
+
+    def cached_json(self) -> list:
+        """ Return the [public, serialization, text] JSON cache of the
+        object, or None when it has to be rebuilt
+        """
+        return getattr(self, '_Base__json', None)
+
+    def attributes(self) -> Iterable[tuple]:
+        """ Return the (name, value) pairs of the instance attributes,
+        whether they live in __dict__ or in __slots__
+        """
+        if not COMPACT_OBJECTS:
+            return [(key, value) for key, value in self.__dict__.items()
+                    if key != '_Base__json']
+        result = []
+        for klass in reversed(self.__class__.__mro__):
+            for name in klass.__dict__.get('__slots__', ()):
+                if name != '__json' and hasattr(self, name):
+                    result.append((name, getattr(self, name)))
+        result.extend((key, value) for key, value
+                      in getattr(self, '__dict__', {}).items()
+                      if key != '_Base__json')
         return result
 
     @classmethod
     def load_from_file(cls):
         """ Load all objects from file
+
+        The backend is read incrementally and records are stored raw:
+        each object is only built when it is first accessed.
+        """
+        cls.flush()
+        cls.reload()
+
+    @classmethod
+    def reload(cls):
+        """ Replace the stored objects with the content of the backend
+        """
+        s_class = cls.__name__
+        store = LazyStore(cls)
+        # records hold no cycles: collecting while millions of them are
+        # allocated only costs repeated full-heap traversals
+        collecting = gc.isenabled()
+        gc.disable()
+        try:
+            # the store isn't shared yet: no lock to take
+            for op, obj_id, obj_json in BACKEND.load(s_class):
+                if op == 'remove':
+                    dict.pop(store, obj_id, None)
+                else:
+                    dict.__setitem__(store, obj_id, obj_json)
+            DATA[s_class] = store
+            cls.reindex()
+        finally:
+            if collecting:
+                gc.enable()
+
+    @classmethod
+    def sync(cls, exclude: Iterable[str] = ()):
+        """ Apply the changes written by other processes since the last
+        sync (multiprocess mode only)
+
+        Objects in exclude, or with a write still queued here, keep
+        their local state: that write comes last and wins.
+        """
+        if not MULTIPROCESS:
+            return
+        s_class = cls.__name__
+        store = DATA[s_class]
+        with store.lock:
+            changes = BACKEND.changes(s_class)
+            if changes == []:
+                return
+            with PENDING_LOCK:
+                keep = set(exclude)
+                keep.update(change[1] for change
+                            in PENDING_RECORDS.get(s_class, []))
+            if changes is not None:
+                indexes = cls.indexes()
+                for op, obj_id, obj_json in changes:
+                    if obj_id in keep:
+                        continue
+                    stored = dict.get(store, obj_id)
+                    for index in indexes:
+                        if stored is not None:
+                            index.discard(obj_id, stored)
+                        if op == 'save':
+                            index.add(obj_id, obj_json)
+                    if op == 'remove':
+                        store.pop(obj_id, None)
+                    else:
+                        store[obj_id] = obj_json
+                return
+
+        # reload() takes the backend lock, which is never taken while
+        # holding a store lock: it runs between the two
+        cls.reload()
+        with store.lock, DATA[s_class].lock:
+            for obj_id in keep:
+                obj = dict.get(store, obj_id)
+                if obj is None:
+                    DATA[s_class].pop(obj_id, None)
+                else:
+                    DATA[s_class][obj_id] = obj
+            cls.reindex()
+
+    @classmethod
+    def flush_records(cls):
+        """ Write the changes queued for the background writer
         """
         s_class = cls.__name__
-        file_path = ".db_{}.json".format(s_class)
-        DATA[s_class] = {}
-        if not path.exists(file_path):
+        with BACKEND.locked(s_class):
+            with PENDING_LOCK:
+                changes = PENDING_RECORDS.pop(s_class, [])
+            if len(changes) > 0:
+                cls.sync(exclude=[change[1] for change in changes])
+                BACKEND.apply(s_class, changes)
+        if 0 < COMPACT_SIZE <= BACKEND.journal_size(s_class):
+            cls.compact()
+
+    @classmethod
+    @contextmanager
+    def writing(cls):
+        """ Hold the locks of one write of the class
+
+        The store lock serializes the writes in memory with the order
+        they are persisted in. Locks are always taken backend lock
+        first, so a write persisted right away (sync durability) takes
+        that one before the store lock.
+        """
+        s_class = cls.__name__
+        if DURABILITY == 'sync':
+            with BACKEND.locked(s_class), DATA[s_class].lock:
+                yield
+        else:
+            with DATA[s_class].lock:
+                yield
+
+    @classmethod
+    def persist(cls, op: str, obj_id: str,
+                obj_text: str = None) -> Callable[[], None]:
+        """ Write one change of the class (op "save" with the JSON text
+        of the object, or "remove"), see persist_many()
+        """
+        return cls.persist_many([(op, obj_id, obj_text)])
+
+    @classmethod
+    def persist_many(cls, changes: List[tuple]) -> Callable[[], None]:
+        """ Write (op, id, JSON text) changes of the class with the
+        configured backend and durability, or queue them for the
+        background writer
+
+        Call it within writing(), then pass what it returns, the write
+        to hand to the background writer (None when written already),
+        to commit() once out of it.
+        """
+        s_class = cls.__name__
+        if BACKEND.row_level:
+            if DURABILITY == 'sync':
+                with BACKEND.locked(s_class):
+                    cls.sync(exclude=[change[1] for change in changes])
+                    BACKEND.apply(s_class, changes)
+                if 0 < COMPACT_SIZE <= BACKEND.journal_size(s_class):
+                    cls.compact()
+                return None
+            with PENDING_LOCK:
+                PENDING_RECORDS.setdefault(s_class, []).extend(changes)
+            return cls.flush_records
+        if DURABILITY == 'sync':
+            cls.save_to_file()
+            return None
+        return cls.save_to_file
+
+    @classmethod
+    def commit(cls, write: Callable[[], None]):
+        """ Hand the write returned by persist() to the background
+        writer, and wait for it when durability is group
+        """
+        if write is None:
             return
+        batch = WRITER.submit(cls.__name__, write)
+        if DURABILITY == 'group':
+            WRITER.wait(batch, cls.__name__)
+
+    @classmethod
+    def flush(cls):
+        """ Wait until every write handed to the background writer, for
+        all classes, is on disk (call it before shutting down)
+        """
+        WRITER.flush()
 
-        with open(file_path, 'r') as f:
-            objs_json = json.load(f)
-            for obj_id, obj_json in objs_json.items():
-                DATA[s_class][obj_id] = cls(**obj_json)
+    @classmethod
+    def compact(cls, wait: bool = False) -> threading.Thread:
+        """ Fold the journal of the class into a new snapshot, in a
+        background thread, and return that thread (join it, or set
+        wait, to block until it is done)
+
+        Only one compaction of a class runs at a time: asking again
+        while it runs returns the running thread.
+        """
+        s_class = cls.__name__
+        with COMPACTIONS_LOCK:
+            thread = COMPACTIONS.get(s_class)
+            if thread is None or not thread.is_alive():
+                thread = threading.Thread(target=BACKEND.compact,
+                                          args=(s_class,), daemon=True)
+                COMPACTIONS[s_class] = thread
+                thread.start()
+        if wait:
+            thread.join()
+        return thread
 
     @classmethod
     def save_to_file(cls):
         """ Save all objects to file
         """
         s_class = cls.__name__
-        file_path = ".db_{}.json".format(s_class)
-        objs_json = {}
-        for obj_id, obj in DATA[s_class].items():
-            objs_json[obj_id] = obj.to_json(True)
 
-        with open(file_path, 'w') as f:
-            json.dump(objs_json, f)
+        def objs_text():
+            # read by dump() under its lock, so that of two dumps
+            # running at once, the last one holds the last writes
+            for obj_id, obj in DATA[s_class].snapshot():
+                if type(obj) is dict:
+                    yield obj_id, json.dumps(obj)
+                else:
+                    yield obj_id, obj.to_json_text()
+
+        with BACKEND.locked(s_class):
+            cls.sync()
+            BACKEND.dump(s_class, objs_text())
 
     def save(self):
         """ Save current object
         """
-        s_class = self.__class__.__name__
-        self.updated_at = datetime.utcnow()
-        DATA[s_class][self.id] = self
-        self.__class__.save_to_file()
+        self.__class__.save_many([self])
 
     def remove(self):
         """ Remove object
         """
-        s_class = self.__class__.__name__
-        if DATA[s_class].get(self.id) is not None:
-            del DATA[s_class][self.id]
-            self.__class__.save_to_file()
+        self.__class__.remove_many([self])
+
+    @classmethod
+    def save_many(cls, objs: Iterable[TypeVar('Base')]):
+        """ Save several objects of the class, with a single write to
+        the backend and a single update of each index
+
+        When several objects share an id, the last one is saved.
+        """
+        s_class = cls.__name__
+        objs = list({obj.id: obj for obj in objs}.values())
+        now = datetime.utcnow()
+        for obj in objs:
+            obj.updated_at = now
+            if BACKEND.row_level:
+                # fills the cache out of the lock: taken again below, it
+                # is only rebuilt if another thread changes the object
+                obj.to_json_text()
+        with cls.writing():
+            store = DATA[s_class]
+            indexes = cls.indexes()
+            added = []
+            for obj in objs:
+                stored = dict.get(store, obj.id)
+                if stored is not obj:
+                    if stored is not None:
+                        for index in indexes:
+                            index.discard(obj.id, stored)
+                    added.append((obj.id, obj))
+            if len(added) > 0:
+                for index in indexes:
+                    index.add_many(added)
+                store.update(added)
+            if BACKEND.row_level:
+                write = cls.persist_many([('save', obj.id, obj.to_json_text())
+                                          for obj in objs])
+            else:
+                write = cls.persist_many([('save', obj.id, None)
+                                          for obj in objs])
+        cls.commit(write)
+
+    @classmethod
+    def remove_many(cls, objs: Iterable[TypeVar('Base')]):
+        """ Remove several objects of the class, with a single write to
+        the backend and a single update of each index
+        """
+        s_class = cls.__name__
+        with cls.writing():
+            store = DATA[s_class]
+            removed = []
+            for obj_id in {obj.id: None for obj in objs}:
+                stored = dict.get(store, obj_id)
+                if stored is not None:
+                    removed.append((obj_id, stored))
+            if len(removed) == 0:
+                return
+            for index in cls.indexes():
+                index.discard_many(removed)
+            for obj_id, _ in removed:
+                store.pop(obj_id, None)
+            write = cls.persist_many([('remove', obj_id, None)
+                                      for obj_id, _ in removed])
+        cls.commit(write)
+
+    @classmethod
+    def indexes(cls) -> List[object]:
+        """ Return the indexes of the class, building them on first use
+        """
+        s_class = cls.__name__
+        if INDEXES.get(s_class) is None:
+            cls.reindex()
+        return INDEXES[s_class]
+
+    @classmethod
+    def reindex(cls):
+        """ Rebuild all indexes of the class from the stored objects
+        """
+        s_class = cls.__name__
+        indexes = [HashIndex(attribute) for attribute in cls.__indexes__]
+        indexes.extend(OrderedIndex(attribute) for attribute
+                       in ('id',) + tuple(cls.__ordered_indexes__))
+        indexes.extend(Counter(name, *counter)
+                       for name, counter in cls.__stats__.items())
+        store = DATA.get(s_class, LazyStore(cls))
+        for index in indexes:
+            index.build(store)
+        INDEXES[s_class] = indexes
 
     @classmethod
     def count(cls) -> int:
         """ Count all objects
         """
+        cls.sync()
         s_class = cls.__name__
         return len(DATA[s_class].keys())
 
+    @classmethod
+    def stats(cls) -> dict:
+        """ Return the number of objects by key of each statistic of
+        __stats__, maintained on every change rather than scanned
+        """
+        cls.sync()
+        return {index.name: index.counts() for index in cls.indexes()
+                if type(index) is Counter}
+
     @classmethod
     def all(cls) -> Iterable[TypeVar('Base')]:
         """ Return all objects
         """
         return cls.search()
 
+    @classmethod
+    def page(cls, after: str = None,
+             limit: int = None) -> List[TypeVar('Base')]:
+        """ Return up to limit objects in id order, starting after the
+        id after (from the first one when None)
+        """
+        where = {} if after is None else {'id': {'gt': after}}
+        return cls.query(where, order_by='id', limit=limit)
+
+    @classmethod
+    def page_json(cls, after: str = None, limit: int = None) -> List[dict]:
+        """ Return the to_json() of up to limit objects in id order,
+        starting after the id after, building no object: raw records are
+        read as they are, so that scanning a whole class doesn't fill
+        the store with objects
+        """
+        cls.sync()
+        s_class = cls.__name__
+        store = DATA[s_class]
+        ids = [index for index in cls.indexes()
+               if type(index) is OrderedIndex and index.attribute == 'id'][0]
+        condition = {} if after is None else {'gt': after}
+        result = []
+        for obj_id in ids.scan(condition):
+            obj = dict.get(store, obj_id)
+            if obj is None:
+                continue
+            if type(obj) is dict:
+                result.append({key: value for key, value in obj.items()
+                               if key[0] != '_'})
+            else:
+                result.append(obj.to_json())
+            if len(result) == limit:
+                break
+        return result
+
+    @classmethod
+    def query(cls, where: dict = {}, order_by: str = None,
+              limit: int = None, explain: bool = False):
+        """ Return the objects matching where, sorted by the attribute
+        order_by ("-name" for descending) and cut at limit
+
+        where maps attribute names to a value to be equal to, or to a
+        dictionary of operators: prefix, gt, gte, lt and lte. An index
+        is used when one covers a condition or the order, and results
+        coming in index order stop the scan at limit.
+
+        With explain, return a dictionary describing the plan and the
+        number of objects examined instead of the objects.
+        """
+        cls.sync()
+        s_class = cls.__name__
+        conditions = {}
+        equal = {}
+        for name, condition in where.items():
+            if type(condition) is dict and len(condition) > 0 and \
+                    all(op in QUERY_OPERATORS for op in condition):
+                conditions[name] = condition
+            else:
+                conditions[name] = {'gte': condition, 'lte': condition}
+                equal[name] = condition
+        descending = order_by is not None and order_by.startswith('-')
+        order_name = order_by[1:] if descending else order_by
+
+        plan = {'strategy': 'full scan', 'index': None,
+                'in_order': order_name is None}
+        obj_ids = None
+        hashed = {index.attribute: index for index in cls.indexes()
+                  if type(index) is HashIndex}
+        ordered = {index.attribute: index for index in cls.indexes()
+                   if type(index) is OrderedIndex}
+        for name in equal:
+            if name in hashed:
+                obj_ids = hashed[name].lookup(equal)
+                if obj_ids is not None:
+                    plan.update(strategy='hash index', index=name)
+                    break
+        if obj_ids is None:
+            # an index both filtering and ordering, then one filtering,
+            # then one ordering
+            candidates = [name for name in conditions if name in ordered]
+            candidates.sort(key=lambda name: name != order_name)
+            if len(candidates) == 0 and order_name in ordered:
+                candidates = [order_name]
+            if len(candidates) > 0:
+                name = candidates[0]
+                obj_ids = ordered[name].scan(conditions.get(name, {}),
+                                             reverse=descending)
+                plan.update(strategy='ordered index', index=name,
+                            in_order=plan['in_order'] or name == order_name)
+        if obj_ids is None:
+            obj_ids = [obj_id for obj_id, _ in DATA[s_class].snapshot()]
+
+        objs = []
+        examined = 0
+        for obj_id in obj_ids:
+            obj = DATA[s_class].get(obj_id)
+            if obj is None:
+                continue
+            examined += 1
+            if cls._matches(obj, conditions):
+                objs.append(obj)
+                if plan['in_order'] and len(objs) == limit:
+                    break
+        if not plan['in_order']:
+            objs.sort(key=lambda obj: (sort_key(attribute_value(
+                obj, order_name)), obj.id), reverse=descending)
+        if limit is not None:
+            objs = objs[:limit]
+        if explain:
+            plan.update(examined=examined, returned=len(objs))
+            return plan
+        return objs
+
+    @staticmethod
+    def _matches(obj: TypeVar('Base'), conditions: dict) -> bool:
+        """ Tell whether obj meets every query() condition
+        """
+        for name, condition in conditions.items():
+            value = sort_key(attribute_value(obj, name))
+            for op, bound in condition.items():
+                if op == 'prefix':
+                    if value[0] != 2 or not value[1].startswith(bound):
+                        return False
+                    continue
+                bound = sort_key(bound)
+                if op == 'gt' and not value > bound or \
+                        op == 'gte' and not value >= bound or \
+                        op == 'lt' and not value < bound or \
+                        op == 'lte' and not value <= bound:
+                    return False
+        return True
+
     @classmethod
     def get(cls, id: str) -> TypeVar('Base'):
         """ Return one object by ID
         """
+        cls.sync()
         s_class = cls.__name__
         return DATA[s_class].get(id)
 
@@ -125,7 +786,18 @@ class Base():
     def search(cls, attributes: dict = {}) -> List[TypeVar('Base')]:
         """ Search all objects with matching attributes
         """
+        cls.sync()
         s_class = cls.__name__
+        objs = None
+        for index in cls.indexes():
+            obj_ids = index.lookup(attributes)
+            if obj_ids is not None:
+                objs = [DATA[s_class].get(obj_id) for obj_id in obj_ids]
+                objs = [obj for obj in objs if obj is not None]
+                break
+        if objs is None:
+            objs = DATA[s_class].values()
+
         def _search(obj):
             if len(attributes) == 0:
                 return True
@@ -134,4 +806,4 @@ class Base():
                     return False
             return True
 
-        return list(filter(_search, DATA[s_class].values()))
+        return list(filter(_search, objs))
@@ -0,0 +1,293 @@
+#!/usr/bin/env python3
+""" Index module
+"""
+from bisect import bisect_left, bisect_right, insort
+from datetime import datetime
+from typing import Iterable, Iterator
+
+
+def attribute_value(obj: object, name: str) -> object:
+    """ Return the attribute name of an object, or of its raw record
+    when it hasn't been built yet
+    """
+    if type(obj) is dict:
+        return obj.get(name)
+    return getattr(obj, name, None)
+
+
+class HashIndex():
+    """ Secondary index mapping the value of one attribute to the ids
+    of the objects holding it
+    """
+
+    def __init__(self, attribute: str):
+        """ Initialize an empty index on attribute
+        """
+        self.attribute = attribute
+        self.attributes = (attribute,)
+        self._ids = {}
+        self._unhashable = {}
+
+    def add(self, obj_id: str, obj: object):
+        """ Index obj under its current value
+        """
+        value = attribute_value(obj, self.attribute)
+        try:
+            ids = self._ids.get(value)
+            if ids is None:
+                self._ids[value] = {obj_id: None}
+            else:
+                ids[obj_id] = None
+        except TypeError:
+            self._unhashable[obj_id] = None
+
+    def build(self, store: dict):
+        """ Index all objects of a LazyStore at once
+        """
+        add = self.add
+        for obj_id, obj in store.raw_items():
+            add(obj_id, obj)
+
+    def add_many(self, pairs: Iterable[tuple]):
+        """ Index several (id, object) pairs
+        """
+        for obj_id, obj in pairs:
+            self.add(obj_id, obj)
+
+    def discard_many(self, pairs: Iterable[tuple]):
+        """ Remove several (id, object) pairs from the index
+        """
+        for obj_id, obj in pairs:
+            self.discard(obj_id, obj)
+
+    def discard(self, obj_id: str, obj: object):
+        """ Remove obj from the index, using its current value
+        """
+        value = attribute_value(obj, self.attribute)
+        try:
+            ids = self._ids.get(value)
+        except TypeError:
+            self._unhashable.pop(obj_id, None)
+            return
+        if ids is not None:
+            ids.pop(obj_id, None)
+            if len(ids) == 0:
+                del self._ids[value]
+
+    def lookup(self, attributes: dict) -> Iterable[str]:
+        """ Return the candidate ids for the equality search attributes,
+        or None if this index doesn't cover them
+
+        Candidates must still be checked against every attribute.
+        """
+        if self.attribute not in attributes:
+            return None
+        try:
+            ids = self._ids.get(attributes[self.attribute], {})
+        except TypeError:
+            return None
+        if len(self._unhashable) == 0:
+            return list(ids)
+        return list(ids) + list(self._unhashable)
+
+
+class _Top():
+    """ Value sorting after any other one, to bisect past all the keys
+    sharing a first element
+    """
+
+    def __lt__(self, other: object) -> bool:
+        """ Nothing is greater
+        """
+        return False
+
+    def __gt__(self, other: object) -> bool:
+        """ Everything is smaller
+        """
+        return True
+
+
+TOP = _Top()
+
+# keys read at once by OrderedIndex.scan(), which then bisects again
+# from the last one so that concurrent writes don't shift its position
+SCAN_CHUNK = 256
+# keys added or removed one by one by OrderedIndex.add_many() and
+# discard_many(); beyond that, the whole list is rebuilt in one pass
+MERGE_SIZE = 32
+
+
+def sort_key(value: object) -> tuple:
+    """ Return a key ordering values of any type: None, then numbers,
+    then strings, then anything else by repr
+
+    Datetimes sort as their text to the second, like the stored
+    records, so a bound can be given either way.
+    """
+    if value is None:
+        return (0, 0)
+    if isinstance(value, datetime):
+        return (2, value.isoformat(timespec='seconds'))
+    if isinstance(value, (int, float)):
+        return (1, value)
+    if isinstance(value, str):
+        return (2, value)
+    return (3, repr(value))
+
+
+def prefix_bounds(prefix: str) -> tuple:
+    """ Return the (low, high) sort keys around all strings starting
+    with prefix
+    """
+    if prefix == "":
+        return (2, ""), (3,)
+    last = ord(prefix[-1])
+    if last == 0x10FFFF:
+        return (2, prefix), (3,)
+    return (2, prefix), (2, prefix[:-1] + chr(last + 1))
+
+
+class OrderedIndex():
+    """ Secondary index keeping the (sort key, id) pairs of one
+    attribute sorted, for equality, prefix and range scans in order
+
+    The keys are only sorted on the first scan, so that loading a store
+    doesn't pay for indexes no query uses. The store lock is held while
+    sorting: the writers, holding it too, can't be missed meanwhile.
+    """
+
+    def __init__(self, attribute: str):
+        """ Initialize an empty index on attribute
+        """
+        self.attribute = attribute
+        self.attributes = (attribute,)
+        self._keys = []
+        self._source = None
+
+    def build(self, store: dict):
+        """ Index all objects of a LazyStore, read on the first scan
+        """
+        self._keys = None
+        self._source = store
+
+    def _sorted(self) -> list:
+        """ Return the sorted keys, building them on first use
+        """
+        keys = self._keys
+        if keys is None:
+            with self._source.lock:
+                if self._keys is None:
+                    self._keys = sorted(
+                        (sort_key(attribute_value(obj, self.attribute)),
+                         obj_id)
+                        for obj_id, obj in self._source.raw_items())
+                keys = self._keys
+        return keys
+
+    def add(self, obj_id: str, obj: object):
+        """ Index obj under its current value
+        """
+        if self._keys is None:
+            return
+        insort(self._keys,
+               (sort_key(attribute_value(obj, self.attribute)), obj_id))
+
+    def add_many(self, pairs: Iterable[tuple]):
+        """ Index several (id, object) pairs
+
+        A new list replaces the keys, so that scans running meanwhile
+        keep reading the old one.
+        """
+        if self._keys is None:
+            return
+        keys = [(sort_key(attribute_value(obj, self.attribute)), obj_id)
+                for obj_id, obj in pairs]
+        if len(keys) <= MERGE_SIZE:
+            for key in keys:
+                insort(self._keys, key)
+            return
+        merged = self._keys + keys
+        merged.sort()
+        self._keys = merged
+
+    def discard_many(self, pairs: Iterable[tuple]):
+        """ Remove several (id, object) pairs from the index
+        """
+        if self._keys is None:
+            return
+        pairs = list(pairs)
+        if len(pairs) <= MERGE_SIZE:
+            for obj_id, obj in pairs:
+                self.discard(obj_id, obj)
+            return
+        gone = {(sort_key(attribute_value(obj, self.attribute)), obj_id)
+                for obj_id, obj in pairs}
+        self._keys = [key for key in self._keys if key not in gone]
+
+    def discard(self, obj_id: str, obj: object):
+        """ Remove obj from the index, using its current value
+        """
+        if self._keys is None:
+            return
+        key = (sort_key(attribute_value(obj, self.attribute)), obj_id)
+        i = bisect_left(self._keys, key)
+        if i < len(self._keys) and self._keys[i] == key:
+            del self._keys[i]
+
+    def lookup(self, attributes: dict) -> Iterable[str]:
+        """ Return the ids matching the equality search attributes, or
+        None if this index doesn't cover them
+        """
+        if self.attribute not in attributes:
+            return None
+        value = attributes[self.attribute]
+        return list(self.scan({'gte': value, 'lte': value}))
+
+    def _bounds(self, condition: dict) -> tuple:
+        """ Return the (start, end) positions of the keys matching the
+        prefix, gt, gte, lt and lte operators of condition
+        """
+        keys = self._sorted()
+        start, end = 0, len(keys)
+        if 'prefix' in condition:
+            low, high = prefix_bounds(condition['prefix'])
+            start = max(start, bisect_left(keys, (low,)))
+            end = min(end, bisect_left(keys, (high,)))
+        if 'gte' in condition:
+            start = max(start, bisect_left(keys,
+                                           (sort_key(condition['gte']),)))
+        if 'gt' in condition:
+            start = max(start, bisect_right(
+                keys, (sort_key(condition['gt']), TOP)))
+        if 'lte' in condition:
+            end = min(end, bisect_right(
+                keys, (sort_key(condition['lte']), TOP)))
+        if 'lt' in condition:
+            end = min(end, bisect_left(keys,
+                                       (sort_key(condition['lt']),)))
+        return start, end
+
+    def scan(self, condition: dict = {},
+             reverse: bool = False) -> Iterator[str]:
+        """ Yield the ids whose value matches condition (see _bounds) in
+        value then id order, or the reverse order
+
+        Keys are read SCAN_CHUNK at a time: a caller stopping early
+        never pays for the rest of the range.
+        """
+        start, end = self._bounds(condition)
+        while start < end:
+            if reverse:
+                chunk = self._keys[max(start, end - SCAN_CHUNK):end]
+                chunk.reverse()
+            else:
+                chunk = self._keys[start:min(end, start + SCAN_CHUNK)]
+            if len(chunk) == 0:
+                return
+            for _, obj_id in chunk:
+                yield obj_id
+            start, end = self._bounds(condition)
+            if reverse:
+                end = min(end, bisect_left(self._keys, chunk[-1]))
+            else:
+                start = max(start, bisect_right(self._keys, chunk[-1]))
@@ -1,13 +1,25 @@
 #!/usr/bin/env python3
 """ User module
 """
-import hashlib
-from models.base import Base
+from models.base import Base, COMPACT_OBJECTS
+from models.password import hash_password, hash_passwords, needs_rehash, \
+    verify_password
+from typing import List
+from models.stats import any_set, day_of
 
 
 class User(Base):
     """ User class
     """
+    __indexes__ = ('email',)
+    __ordered_indexes__ = ('email', 'created_at', 'updated_at')
+    __stats__ = {
+        'created_per_day': (('created_at',), day_of('created_at')),
+        'with_name': (('first_name', 'last_name'),
+                      any_set('first_name', 'last_name')),
+    }
+    if COMPACT_OBJECTS:
+        __slots__ = ('email', '_password', 'first_name', 'last_name')
 
     def __init__(self, *args: list, **kwargs: dict):
         """ Initialize a User instance
@@ -26,12 +38,22 @@ class User(Base):
 
     @password.setter
     def password(self, pwd: str):
-        """ Setter of a new password: encrypt in SHA256
+        """ Setter of a new password: hash with salted PBKDF2-SHA256
         """
         if pwd is None or type(pwd) is not str:
             self._password = None
         else:
-            self._password = hashlib.sha256(pwd.encode()).hexdigest().lower()
+            self._password = hash_password(pwd)
+
+    @classmethod
+    def set_passwords(cls, users: List['User'], pwds: List[str]):
+        """ Set the password of each of users to the one of pwds at the
+        same position, hashing them in parallel (see hash_passwords)
+        """
+        valid = [i for i, pwd in enumerate(pwds) if type(pwd) is str]
+        hashes = dict(zip(valid, hash_passwords([pwds[i] for i in valid])))
+        for i, user in enumerate(users):
+            user._password = hashes.get(i)
 
     def is_valid_password(self, pwd: str) -> bool:
         """ Validate a password
@@ -40,8 +62,19 @@ class User(Base):
             return False
         if self.password is None:
             return False
-        pwd_e = pwd.encode()
-        return hashlib.sha256(pwd_e).hexdigest().lower() == self.password
+        return verify_password(pwd, self.password)
+
+    def upgrade_password(self, pwd: str) -> bool:
+        """ Hash again the valid password pwd when its stored hash
+        doesn't follow the current policy, and save the user
+
+        Return whether the user was saved.
+        """
+        if self.password is None or not needs_rehash(self.password):
+            return False
+        self.password = pwd
+        self.save()
+        return True
 
     def display_name(self) -> str:
         """ Display User name based on email/first_name/last_name
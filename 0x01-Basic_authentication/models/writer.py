@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+""" Background writer module
+"""
+from typing import Callable
+import atexit
+import threading
+import time
+
+
+class WriteBatch():
+    """ Writes flushed together by the writer thread, and the errors
+    they met by key
+    """
+    __slots__ = ('number', 'errors', 'done', 'waited')
+
+    def __init__(self, number: int):
+        """ Initialize the empty batch number
+        """
+        self.number = number
+        self.errors = {}
+        self.done = False
+        self.waited = False
+
+
+class BackgroundWriter():
+    """ Thread running the pending writes of the Base classes
+
+    Writes are submitted under a key: several writes with the same key
+    before a flush are coalesced into one call. A batch is flushed when
+    it reaches batch_size writes or interval seconds after its first
+    write; an interval of 0 flushes as soon as the thread is free, which
+    groups the writes submitted while the previous batch was on disk.
+
+    An error is kept by the batch and key of the write that raised it:
+    wait() raises it to the submitters of that key in that batch only,
+    and flush() to its caller when nobody waited for that batch.
+    """
+
+    def __init__(self, interval: float = 1.0, batch_size: int = 1000):
+        """ Initialize a writer, its thread starts on the first submit
+        """
+        self.interval = interval
+        self.batch_size = batch_size
+        self._cond = threading.Condition()
+        self._pending = {}
+        self._count = 0
+        self._first_at = None
+        self._batch = WriteBatch(1)
+        self._flushed = 0
+        # flushed batches with errors, until flush() reports them
+        self._failed = []
+        self._urgent = False
+        self._thread = None
+
+    def submit(self, key: str, write: Callable[[], None]) -> WriteBatch:
+        """ Queue write under key and return the batch that will run it,
+        to be passed to wait() with key
+        """
+        with self._cond:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run,
+                                                daemon=True)
+                self._thread.start()
+                atexit.register(self.flush)
+            if len(self._pending) == 0:
+                self._first_at = time.monotonic()
+            self._pending[key] = write
+            self._count += 1
+            self._cond.notify_all()
+            return self._batch
+
+    def wait(self, batch: WriteBatch, key: str):
+        """ Block until batch has been written, raising the error met by
+        the write of key in it
+        """
+        with self._cond:
+            while not batch.done:
+                self._cond.wait()
+            batch.waited = True
+        error = batch.errors.get(key)
+        if error is not None:
+            raise error
+
+    def flush(self):
+        """ Write everything submitted so far and wait for it, raising
+        the first error of the batches nobody waited for
+        """
+        with self._cond:
+            if self._thread is None:
+                return
+            number = self._batch.number if self._pending \
+                else self._batch.number - 1
+            self._urgent = True
+            self._cond.notify_all()
+            while self._flushed < number:
+                self._cond.wait()
+            failed, self._failed = self._failed, []
+        for batch in failed:
+            if not batch.waited:
+                raise next(iter(batch.errors.values()))
+
+    def _ready(self) -> bool:
+        """ Tell if the pending batch must be written now
+        """
+        if self._urgent or self._count >= self.batch_size:
+            return True
+        return time.monotonic() - self._first_at >= self.interval
+
+    def _run(self):
+        """ Loop of the writer thread
+        """
+        while True:
+            with self._cond:
+                while len(self._pending) == 0 or not self._ready():
+                    timeout = None
+                    if len(self._pending) > 0:
+                        timeout = self._first_at + self.interval \
+                            - time.monotonic()
+                    self._cond.wait(timeout)
+                pending, self._pending = self._pending, {}
+                batch = self._batch
+                self._batch = WriteBatch(batch.number + 1)
+                self._count = 0
+                self._urgent = False
+
+            for key, write in pending.items():
+                try:
+                    write()
+                except Exception as e:
+                    batch.errors[key] = e
+
+            with self._cond:
+                batch.done = True
+                self._flushed = batch.number
+                if batch.errors:
+                    self._failed.append(batch)
+                self._cond.notify_all()
@@ -3,10 +3,12 @@
 Route module for the API
 """
 from os import getenv
-from api.v1.views.app_views import app_views
+from api.v1.views import app_views
 from api.v1.auth.session_auth import SessionAuth  # Import SessionAuth
 from api.v1.auth.session_exp_auth import SessionExpAuth
 from api.v1.auth.session_db_auth import SessionDBAuth
+from api.v1.auth.path_matcher import PathMatcher
+from api.v1.auth.context import AuthContext
 from flask import Flask, jsonify, abort, request
 from flask_cors import CORS
 
@@ -14,6 +16,11 @@ app = Flask(__name__)
 app.register_blueprint(app_views)
 CORS(app, resources={r"/api/v1/*": {"origins": "*"}})
 auth = None
+# paths served without authentication, compiled once
+EXCLUDED_PATHS = PathMatcher(["/api/v1/status/",
+                              "/api/v1/unauthorized/",
+                              "/api/v1/forbidden/",
+                              "/api/v1/auth_session/login/"])
 
 if getenv("AUTH_TYPE") == "auth":
     from api.v1.auth.auth import Auth
@@ -27,22 +34,37 @@ elif getenv("AUTH_TYPE") == "session_auth":
     from api.v1.auth.session_auth import SessionAuth
     auth = SessionAuth()
 
+elif getenv("AUTH_TYPE") == "session_exp_auth":
+    auth = SessionExpAuth()
+
+elif getenv("AUTH_TYPE") == "session_db_auth":
+    auth = SessionDBAuth()
+
+elif getenv("AUTH_TYPE") == "session_token_auth":
+    from api.v1.auth.session_token_auth import SessionTokenAuth
+    auth = SessionTokenAuth()
+
 @app.before_request
 def beforeRequest() -> None:
     """ Method to filter every request.
     """
+    # the user is resolved once, on first use, by this hook or a view
+    request.auth_context = AuthContext(auth, request)
     if auth is not None:
         if auth.require_auth(path=request.path,
-                             excluded_paths=["/api/v1/status/",
-                                             "/api/v1/unauthorized/",
-                                             "/api/v1/forbidden/",
-                                             "/api/v1/auth_session/login/"]):
+                             excluded_paths=EXCLUDED_PATHS):
             ah = auth.authorization_header(request)
             if not ah and not auth.session_cookie(request):
                 abort(401)
-            if not auth.current_user(request):
+            if not request.auth_context.user:
                 abort(403)
-            request.current_user = auth.current_user(request)
+            request.current_user = request.auth_context.user
+
+@app.errorhandler(400)
+def bad_request(error) -> str:
+    """ Bad request handler.
+    """
+    return jsonify({"error": "Bad request"}), 400
 
 @app.errorhandler(404)
 def not_found(error) -> str:
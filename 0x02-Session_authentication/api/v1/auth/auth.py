@@ -4,11 +4,14 @@
 from flask import request
 from typing import List, TypeVar
 from os import getenv
+from api.v1.auth.path_matcher import PathMatcher, compile_paths
 
 
 class Auth:
     """ Class to manage the API authentication.
     """
+    # name of the scheme authenticating the users, None for none
+    scheme = None
 
     def require_auth(self, path: str, excluded_paths: List[str]) -> bool:
         """ Method
@@ -16,17 +19,17 @@ class Auth:
                 path: String type.
                 excluded_paths: List type.
             Return:
-                True if the path is not in the list of strings.
+                True if the path is not in the list of strings: with or
+                without a trailing slash, or starting with what precedes
+                the "*" ending one of them.
         """
         if path is None:
             return True
-        if excluded_paths is None or excluded_paths == []:
+        if excluded_paths is None or len(excluded_paths) == 0:
             return True
-        if path[-1] != "/":
-            path += "/"
-        if path in excluded_paths:
-            return False
-        return True
+        if type(excluded_paths) is not PathMatcher:
+            excluded_paths = compile_paths(tuple(excluded_paths))
+        return not excluded_paths.match(path)
 
     def authorization_header(self, request=None) -> str:
         """ Method to validate all requests to protect the API.
@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+""" Authentication context of a request
+"""
+from typing import TypeVar
+
+
+class AuthContext:
+    """ Principal of one request, resolved at most once.
+
+    The before_request hook attaches one to request.auth_context: the
+    hooks and views read the user from it instead of asking the auth
+    again, which would repeat the session or credentials lookup.
+    """
+
+    def __init__(self, auth=None, request=None):
+        """ Initialize the context of request, resolved by auth on first
+        use
+        """
+        self.auth = auth
+        self.request = request
+        self._resolved = False
+        self._user = None
+
+    @property
+    def user(self) -> TypeVar('User'):
+        """ Return the authenticated user, None without one
+        """
+        if not self._resolved:
+            if self.auth is not None:
+                self._user = self.auth.current_user(self.request)
+            self._resolved = True
+        return self._user
+
+    @property
+    def scheme(self) -> str:
+        """ Return the scheme that authenticated the user ("basic",
+        "session"...), None without one
+        """
+        if self.user is None:
+            return None
+        return getattr(self.auth, 'scheme', None)
+
+
+def auth_context(request) -> AuthContext:
+    """ Return the context of request, an empty one outside the API
+    """
+    context = getattr(request, 'auth_context', None)
+    if context is None:
+        return AuthContext()
+    return context
@@ -1,61 +1,91 @@
 #!/usr/bin/env python3
-""" Auth class.
+""" SessionAuth class.
 """
-from flask import request
-from typing import List, TypeVar
-from os import getenv
+from api.v1.auth.auth import Auth
+from api.v1.auth.session_map import SessionMap
+from models.user import User
+from threading import Lock
+from typing import TypeVar
+import uuid
 
-class Auth:
-    """ Class to manage the API authentication.
+
+class SessionAuth(Auth):
+    """ Class to manage the API authentication with in-memory Session IDs.
+
+    The sessions are kept in a SessionMap shared by the request threads,
+    each create, lookup and destroy locking the shard of its Session ID.
     """
+    scheme = "session"
+    user_id_by_session_id = SessionMap()
+    # sessions created and destroyed since start, kept on every change
+    # so that session_stats() doesn't depend on the number of sessions
+    session_counts = {"created": 0, "destroyed": 0}
+    session_counts_lock = Lock()
 
-    def require_auth(self, path: str, excluded_paths: List[str]) -> bool:
-        """ Method
+    def create_session(self, user_id: str = None) -> str:
+        """ Method that creates a Session ID for a user_id.
             Args:
-                path: String type.
-                excluded_paths: List type.
+                user_id: String type.
             Return:
-                True if the path is not in the list of strings.
+                The Session ID, None if user_id isn't a string.
         """
-        if path is None:
-            return True
-        if excluded_paths is None or excluded_paths == []:
-            return True
-        if path[-1] != "/":
-            path += "/"
-        if path in excluded_paths:
-            return False
-        return True
+        if user_id is None or type(user_id) is not str:
+            return None
+        session_id = str(uuid.uuid4())
+        self.user_id_by_session_id[session_id] = user_id
+        with self.session_counts_lock:
+            self.session_counts["created"] += 1
+        return session_id
 
-    def authorization_header(self, request=None) -> str:
-        """ Method to validate all requests to protect the API.
+    def user_id_for_session_id(self, session_id: str = None) -> str:
+        """ Method that returns the User ID of a Session ID.
             Args:
-                request.
+                session_id: String type.
             Return:
-                None - request.
+                The User ID, None if the Session ID is unknown.
         """
-        if request is None:
-            return None
-        if "Authorization" not in request.headers:
+        if session_id is None or type(session_id) is not str:
             return None
-        else:
-            return request.headers["Authorization"]
+        return self.user_id_by_session_id.get(session_id)
 
     def current_user(self, request=None) -> TypeVar('User'):
-        """ Method
+        """ Method that returns the User of the session cookie.
             Args:
                 request.
             Return:
-                None - request.
+                The User instance, None without a valid session.
         """
-        return None
+        user_id = self.user_id_for_session_id(self.session_cookie(request))
+        if user_id is None:
+            return None
+        return User.get(user_id)
 
-    def session_cookie(self, request=None):
-        """ Method that returns a cookie value from a request.
+    def destroy_session(self, request=None) -> bool:
+        """ Method that deletes the session of the request (logout).
+            Args:
+                request.
+            Return:
+                True if a session was deleted, False otherwise.
         """
-        if request is None:
-            return None
-        session_name = getenv('SESSION_NAME')
-        if session_name and session_name in request.cookies:
-            return request.cookies[session_name]
-        return None
+        session_id = self.session_cookie(request)
+        if session_id is None:
+            return False
+        if self.user_id_for_session_id(session_id) is None:
+            return False
+        # the lookup and the pop lock separately: only the thread which
+        # popped the session counts it
+        if self.user_id_by_session_id.pop(session_id, None) is None:
+            return False
+        with self.session_counts_lock:
+            self.session_counts["destroyed"] += 1
+        return True
+
+    def session_stats(self) -> dict:
+        """ Method that returns the session counters.
+            Return:
+                The active sessions, created and destroyed since start.
+        """
+        with self.session_counts_lock:
+            stats = dict(self.session_counts)
+        stats["active"] = len(self.user_id_by_session_id)
+        return stats
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+""" Cache of the sessions looked up recently in the session store
+"""
+from collections import OrderedDict
+from os import getenv
+from threading import Lock
+import time
+
+# sessions kept, least recently used dropped first ("0" disables the cache)
+SESSION_CACHE_SIZE = int(getenv('SESSION_CACHE_SIZE', '10000'))
+# seconds a session is trusted without reading the store again
+SESSION_CACHE_TTL = float(getenv('SESSION_CACHE_TTL', '60'))
+# seconds an unknown Session ID is refused without reading the store
+SESSION_CACHE_NEGATIVE_TTL = float(getenv('SESSION_CACHE_NEGATIVE_TTL',
+                                          '1'))
+
+
+class SessionCache():
+    """ Bounded TTL/LRU cache of (user_id, expiry) by Session ID
+
+    Sessions are put on creation (write-through) and on a miss, and
+    invalidated when destroyed; an ID unknown to the store is cached as
+    a user_id of None for negative_ttl seconds only, so that a session
+    created by another process is found soon after. Positive entries
+    are read again from the store after ttl seconds, for the sessions
+    destroyed by other processes.
+
+    Each invalidation starts a new generation: a lookup of the store
+    passes the generation it started in to put(), which drops its
+    result when a session was destroyed meanwhile, as it may be that
+    one.
+    """
+
+    def __init__(self, size: int = SESSION_CACHE_SIZE,
+                 ttl: float = SESSION_CACHE_TTL,
+                 negative_ttl: float = SESSION_CACHE_NEGATIVE_TTL):
+        """ Initialize an empty cache
+        """
+        self.size = size
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        # (user_id, expires, trusted until) by Session ID
+        self._entries = OrderedDict()
+        self._lock = Lock()
+        self.generation = 0
+        self.hits = 0
+        self.negative_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get(self, session_id: str) -> tuple:
+        """ Return the (user_id, expires) of session_id, user_id being
+        None for an unknown session, or None when the store must be read
+        """
+        if self.size <= 0:
+            return None
+        with self._lock:
+            entry = self._entries.get(session_id)
+            if entry is None:
+                self.misses += 1
+                return None
+            if entry[2] <= time.monotonic():
+                del self._entries[session_id]
+                self.evictions += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(session_id)
+            if entry[0] is None:
+                self.negative_hits += 1
+            else:
+                self.hits += 1
+            return entry[0], entry[1]
+
+    def put(self, session_id: str, user_id: str, expires: int,
+            generation: int = None):
+        """ Remember the user_id and expires of session_id, user_id None
+        for an unknown session, unless a session was invalidated since
+        generation
+        """
+        if self.size <= 0:
+            return
+        ttl = self.ttl if user_id is not None else self.negative_ttl
+        entry = (user_id, expires, time.monotonic() + ttl)
+        with self._lock:
+            if generation is not None and generation != self.generation:
+                return
+            self._entries[session_id] = entry
+            self._entries.move_to_end(session_id)
+            while len(self._entries) > self.size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, session_id: str):
+        """ Forget session_id, destroyed in the store
+        """
+        with self._lock:
+            self.generation += 1
+            if self._entries.pop(session_id, None) is not None:
+                self.invalidations += 1
+
+    def clear(self):
+        """ Forget every session
+        """
+        with self._lock:
+            self.generation += 1
+            self.invalidations += len(self._entries)
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        """ Return the hit, negative hit, miss, eviction and invalidation
+        counts, the hit ratio of the lookups and the sessions cached
+        """
+        with self._lock:
+            hits = self.hits + self.negative_hits
+            lookups = hits + self.misses
+            return {"hits": self.hits, "negative_hits": self.negative_hits,
+                    "misses": self.misses, "evictions": self.evictions,
+                    "invalidations": self.invalidations,
+                    "hit_ratio": round(hits / lookups, 4) if lookups else 0,
+                    "size": len(self._entries)}
@@ -2,48 +2,109 @@
 """
 Session DB Authentication module.
 """
+from api.v1.auth.session_cache import SessionCache
 from api.v1.auth.session_exp_auth import SessionExpAuth
 from models.user_session import UserSession
-from datetime import datetime, timedelta
+from os import getenv
+import calendar
+import time
+import uuid
 
 
 class SessionDBAuth(SessionExpAuth):
     """ Class to manage the API authentication with Session ID in the database.
+
+    The sessions are UserSessions in the file store, found by their
+    indexed session_id, with a SessionCache in front of it: created
+    sessions are written through, destroyed ones invalidated, and most
+    lookups never reach the store. None of the in-memory sessions of
+    SessionExpAuth is used: no session map, expirations nor sweeper.
     """
+    scheme = "session_db"
+    cache = SessionCache()
+    session_counts = {"created": 0, "destroyed": 0}
+
+    def __init__(self):
+        """ Initialize SessionDBAuth, loading the stored sessions,
+        without the sweeper thread of SessionExpAuth.
+        """
+        super(SessionExpAuth, self).__init__()
+        self.session_duration = int(getenv('SESSION_DURATION', 0))
+        # clock of the sessions, in seconds since the epoch
+        self.clock = time.time
+        UserSession.load_from_file()
+
+    def _expires(self, user_session: UserSession) -> int:
+        """ Return the expiry of user_session in whole seconds since the
+        epoch, 0 for never.
+        """
+        if self.session_duration <= 0:
+            return 0
+        created_at = calendar.timegm(user_session.created_at.utctimetuple())
+        return created_at + self.session_duration
 
     def create_session(self, user_id=None):
         """ Create a Session ID and store it in the database.
         """
-        session_id = super().create_session(user_id)
-
-        if session_id:
-            session_obj = UserSession(user_id=user_id, session_id=session_id)
-            session_obj.save()
-            return session_id
+        if user_id is None or type(user_id) is not str:
+            return None
+        session_id = str(uuid.uuid4())
+        user_session = UserSession(user_id=user_id, session_id=session_id)
+        user_session.save()
+        self.cache.put(session_id, user_id, self._expires(user_session))
+        with self.session_counts_lock:
+            self.session_counts["created"] += 1
+        return session_id
 
     def user_id_for_session_id(self, session_id=None):
-        """ Retrieve user_id for Session ID from the database.
+        """ Retrieve user_id for Session ID from the cache, else from the
+        database.
         """
-        if session_id is None:
+        if session_id is None or type(session_id) is not str:
             return None
 
-        session_obj = UserSession.get(session_id)
+        entry = self.cache.get(session_id)
+        if entry is None:
+            generation = self.cache.generation
+            user_sessions = UserSession.search({'session_id': session_id})
+            if len(user_sessions) == 0:
+                entry = (None, 0)
+            else:
+                entry = (user_sessions[0].user_id,
+                         self._expires(user_sessions[0]))
+            self.cache.put(session_id, *entry, generation=generation)
 
-        if session_obj:
-            if self.session_duration <= 0:
-                return session_obj.user_id
-
-            if session_obj.created_at + timedelta(seconds=self.session_duration) >= datetime.utcnow():
-                return session_obj.user_id
-
-        return None
+        user_id, expires = entry
+        if expires and expires <= self.clock():
+            return None
+        return user_id
 
     def destroy_session(self, request=None):
         """ Destroy Session ID from the database.
         """
-        if request and 'session_id' in request.cookies:
-            session_id = request.cookies.get('session_id')
-            session_obj = UserSession.get(session_id)
+        session_id = self.session_cookie(request)
+        if session_id is None:
+            return False
+        user_sessions = UserSession.search({'session_id': session_id})
+        if len(user_sessions) == 0:
+            return False
+        UserSession.remove_many(user_sessions)
+        # after the removal: a lookup of the store started before is
+        # not cached
+        self.cache.invalidate(session_id)
+        with self.session_counts_lock:
+            self.session_counts["destroyed"] += 1
+        return True
 
-            if session_obj:
-                session_obj.delete()
+    def session_stats(self) -> dict:
+        """ Return the session counters, the active ones being stored.
+        """
+        with self.session_counts_lock:
+            stats = dict(self.session_counts)
+        stats["active"] = UserSession.count()
+        return stats
+
+    def session_cache_stats(self) -> dict:
+        """ Return the hit/miss metrics of the session cache.
+        """
+        return self.cache.stats()
@@ -3,55 +3,215 @@
 Session Expiration Authentication module.
 """
 from api.v1.auth.session_auth import SessionAuth
-from datetime import datetime, timedelta
+from api.v1.auth.session_map import SessionMap
 from os import getenv
+import heapq
+import threading
+import time
+import uuid
+
+# seconds between two sweeps of the expired sessions (0: no sweeper)
+SESSION_SWEEP_INTERVAL = float(getenv('SESSION_SWEEP_INTERVAL', '60'))
+# sessions kept at most, least recently used dropped first (0: no limit)
+SESSION_MAX = int(getenv('SESSION_MAX', '0'))
+
+
+class SessionRecord:
+    """ Session of a user: its expiry in whole seconds since the epoch,
+    0 for never.
+    """
+    __slots__ = ('user_id', 'expires')
+
+    def __init__(self, user_id: str, expires: int):
+        """ Initialize the session of user_id, expiring at expires.
+        """
+        self.user_id = user_id
+        self.expires = expires
+
+
+class SessionExpirations:
+    """ IDs of the sessions by second of expiry, with a min-heap of those
+    seconds: pop_expired() pops the expired seconds from its top, so
+    that each session costs O(1) once, however many sweeps run. An ID
+    stays listed once its session is destroyed or evicted, until its
+    second expires or relist() drops it.
+    """
+
+    def __init__(self):
+        """ Initialize an empty listing.
+        """
+        self.lock = threading.Lock()
+        self.session_ids = {}
+        self.heap = []
+        self.last_expires = 0
+        self.listed = 0
+
+    def share(self, expires: int) -> int:
+        """ Return expires as the int object of the previous session when
+        both expire in the same second, to store a single one.
+        """
+        # unlocked: a race only keeps two equal int objects
+        if expires == self.last_expires:
+            return self.last_expires
+        self.last_expires = expires
+        return expires
+
+    def add(self, session_id: str, expires: int):
+        """ List session_id under its second of expiry.
+        """
+        with self.lock:
+            session_ids = self.session_ids.get(expires)
+            if session_ids is None:
+                session_ids = self.session_ids[expires] = []
+                heapq.heappush(self.heap, expires)
+            session_ids.append(session_id)
+            self.listed += 1
+
+    def pop_expired(self, now: float) -> list:
+        """ Remove and return the IDs listed under the seconds up to now.
+        """
+        expired_ids = []
+        with self.lock:
+            heap = self.heap
+            while heap and heap[0] <= now:
+                session_ids = self.session_ids.pop(heapq.heappop(heap))
+                self.listed -= len(session_ids)
+                expired_ids.extend(session_ids)
+        return expired_ids
+
+    def relist(self, live, limit: int):
+        """ Keep only the IDs in live once more than limit are listed:
+        O(1) amortized per session dropped since the previous time.
+        """
+        with self.lock:
+            if self.listed <= limit:
+                return
+            self.listed = 0
+            for expires in list(self.session_ids):
+                session_ids = [session_id for session_id
+                               in self.session_ids[expires]
+                               if session_id in live]
+                self.session_ids[expires] = session_ids
+                self.listed += len(session_ids)
 
 
 class SessionExpAuth(SessionAuth):
     """ Class to manage the API authentication with expiration.
+
+    The sessions are SessionRecords in a SessionMap of their own, kept
+    from least to most recently used in each shard, and listed in
+    SessionExpirations. sweep() drops the expired ones, every
+    SESSION_SWEEP_INTERVAL seconds in a background thread. SESSION_MAX
+    is enforced per shard, as ceil(SESSION_MAX / shards) sessions each:
+    a per-shard approximation of a global least recently used limit,
+    which may drop sessions of a busy shard before SESSION_MAX are kept
+    in all. Lookups only lock the shard of the session, and checking
+    its expiry is one integer comparison.
+
+    Like the sessions of SessionAuth, all of this belongs to the class:
+    started with "python3 -m api.v1.app", the API module is imported
+    twice, and the views and the before_request hook use two instances.
     """
+    scheme = "session_exp"
+    user_id_by_session_id = SessionMap()
+    expirations = SessionExpirations()
+    session_counts = {"created": 0, "destroyed": 0, "expired": 0,
+                      "evicted": 0}
+    sweeper = None
 
     def __init__(self):
         """ Initialize SessionExpAuth.
         """
         super().__init__()
         self.session_duration = int(getenv('SESSION_DURATION', 0))
+        self.max_sessions = SESSION_MAX
+        # clock of the sessions, in seconds since the epoch
+        self.clock = time.time
+        if self.session_duration > 0 and SESSION_SWEEP_INTERVAL > 0:
+            self.start_sweeper(SESSION_SWEEP_INTERVAL)
+
+    def start_sweeper(self, interval: float):
+        """ Start the thread sweeping the sessions of the class every
+        interval seconds, unless it already runs.
+        """
+        cls = type(self)
+        with self.expirations.lock:
+            if cls.__dict__.get('sweeper') is not None:
+                return
+            cls.sweeper = threading.Thread(target=self.sweep_forever,
+                                           args=(interval,), daemon=True)
+        cls.sweeper.start()
 
     def create_session(self, user_id=None):
         """ Create a Session ID with expiration.
         """
-        session_id = super().create_session(user_id)
-
-        if session_id:
-            session_dict = {
-                "user_id": user_id,
-                "created_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            }
-            self.user_id_by_session_id[session_id] = session_dict
-
+        if user_id is None or type(user_id) is not str:
+            return None
+        session_id = str(uuid.uuid4())
+        expires = 0
+        if self.session_duration > 0:
+            expires = self.expirations.share(
+                int(self.clock()) + self.session_duration)
+        # stored once, as its record, and before being listed, so that a
+        # relisting in between keeps it
+        evicted = self.user_id_by_session_id.put(
+            session_id, SessionRecord(user_id, expires),
+            self._shard_capacity())
+        with self.session_counts_lock:
+            self.session_counts["created"] += 1
+            self.session_counts["evicted"] += evicted
+        if expires:
+            self.expirations.add(session_id, expires)
+        if evicted:
+            # the evicted sessions stay listed until they expire: list
+            # the live ones again once they are outnumbered
+            self.expirations.relist(self.user_id_by_session_id,
+                                    2 * self.max_sessions)
+        self.sweep()
         return session_id
 
     def user_id_for_session_id(self, session_id=None):
         """ Retrieve user_id for Session ID with expiration.
         """
-        if session_id is None or session_id not in self.user_id_by_session_id:
+        if session_id is None:
             return None
 
-        session_dict = self.user_id_by_session_id[session_id]
-        user_id = session_dict.get('user_id')
-
-        if self.session_duration <= 0:
-            return user_id
-
-        created_at_str = session_dict.get('created_at')
+        record = self.user_id_by_session_id.touch(session_id)
+        if record is None:
+            return None
 
-        if not created_at_str:
+        if record.expires and record.expires <= self.clock():
             return None
 
-        created_at = datetime.strptime(created_at_str, "%Y-%m-%d %H:%M:%S")
-        expiration_time = created_at + timedelta(seconds=self.session_duration)
+        return record.user_id
 
-        if expiration_time < datetime.now():
-            return None
+    def _shard_capacity(self) -> int:
+        """ Return the sessions kept at most in each shard, 0 for no
+        limit: max_sessions split evenly, rounded up.
+        """
+        if self.max_sessions <= 0:
+            return 0
+        shards = len(self.user_id_by_session_id.shards)
+        return -(-self.max_sessions // shards)
+
+    def sweep(self) -> int:
+        """ Remove the expired sessions, returning how many.
+        """
+        expired_ids = self.expirations.pop_expired(self.clock())
+        if not expired_ids:
+            return 0
+        sessions = self.user_id_by_session_id
+        expired = 0
+        for session_id in expired_ids:
+            if sessions.pop(session_id, None) is not None:
+                expired += 1
+        with self.session_counts_lock:
+            self.session_counts["expired"] += expired
+        return expired
 
-        return user_id
+    def sweep_forever(self, interval: float):
+        """ Sweep the expired sessions every interval seconds.
+        """
+        while True:
+            time.sleep(interval)
+            self.sweep()
@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Sharded session map module.
+"""
+from collections import OrderedDict
+from os import getenv
+from threading import Lock
+
+# shards of a SessionMap, rounded up to a power of two
+SESSION_SHARDS = int(getenv('SESSION_SHARDS', '16'))
+
+
+class SessionShard:
+    """ Sessions of one shard, from least to most recently used, and the
+    lock of every operation on them.
+    """
+    __slots__ = ('lock', 'sessions')
+
+    def __init__(self):
+        """ Initialize an empty shard.
+        """
+        self.lock = Lock()
+        self.sessions = OrderedDict()
+
+
+class SessionMap:
+    """ Dict of the sessions by Session ID, split in shards each with
+    its own lock.
+
+    The shard of a session is picked by the hash of its ID, so that
+    request threads working on different sessions seldom wait for each
+    other. Every single operation holds the lock of its shard: create,
+    lookup and destroy are atomic whatever the number of threads. The
+    size and the iteration read the shards one after the other.
+
+    The least recently used order is kept per shard, and so is the
+    capacity of put(): a cap on the whole map given as capacity / number
+    of shards per shard is only approximate. A shard receiving more
+    than its share of sessions drops its least recently used ones
+    before the map holds that many in total, and those may be more
+    recent than sessions kept in other shards.
+    """
+
+    def __init__(self, shards: int = SESSION_SHARDS):
+        """ Initialize an empty map of at least shards shards.
+        """
+        count = 1
+        while count < shards:
+            count *= 2
+        self.shards = tuple(SessionShard() for _ in range(count))
+        self.mask = count - 1
+
+    def shard(self, session_id: str) -> SessionShard:
+        """ Return the shard of session_id.
+        """
+        return self.shards[hash(session_id) & self.mask]
+
+    def get(self, session_id: str, default=None):
+        """ Return the session of session_id, or default.
+        """
+        shard = self.shard(session_id)
+        with shard.lock:
+            return shard.sessions.get(session_id, default)
+
+    def touch(self, session_id: str):
+        """ Return the session of session_id, or None, marking it as the
+        most recently used of its shard.
+        """
+        shard = self.shard(session_id)
+        with shard.lock:
+            session = shard.sessions.get(session_id)
+            if session is not None:
+                shard.sessions.move_to_end(session_id)
+            return session
+
+    def put(self, session_id: str, session, capacity: int = 0) -> int:
+        """ Store the session of session_id as the most recently used of
+        its shard, dropping the least recently used ones beyond capacity
+        sessions in that shard (0 for no limit), and return how many
+        were dropped. The capacity is per shard, not for the whole map.
+        """
+        shard = self.shard(session_id)
+        evicted = 0
+        with shard.lock:
+            shard.sessions[session_id] = session
+            shard.sessions.move_to_end(session_id)
+            while capacity > 0 and len(shard.sessions) > capacity:
+                shard.sessions.popitem(last=False)
+                evicted += 1
+        return evicted
+
+    def pop(self, session_id: str, default=None):
+        """ Remove and return the session of session_id, or default.
+        """
+        shard = self.shard(session_id)
+        with shard.lock:
+            return shard.sessions.pop(session_id, default)
+
+    def __getitem__(self, session_id: str):
+        """ Return the session of session_id, raising KeyError without.
+        """
+        shard = self.shard(session_id)
+        with shard.lock:
+            return shard.sessions[session_id]
+
+    def __setitem__(self, session_id: str, session):
+        """ Store the session of session_id.
+        """
+        self.put(session_id, session)
+
+    def __delitem__(self, session_id: str):
+        """ Remove the session of session_id, raising KeyError without.
+        """
+        shard = self.shard(session_id)
+        with shard.lock:
+            del shard.sessions[session_id]
+
+    def __contains__(self, session_id: str) -> bool:
+        """ Tell whether session_id has a session.
+        """
+        shard = self.shard(session_id)
+        with shard.lock:
+            return session_id in shard.sessions
+
+    def __len__(self) -> int:
+        """ Return the number of sessions.
+        """
+        return sum(len(shard.sessions) for shard in self.shards)
+
+    def __iter__(self):
+        """ Iterate over the Session IDs, shard after shard.
+        """
+        for shard in self.shards:
+            with shard.lock:
+                session_ids = list(shard.sessions)
+            yield from session_ids
+
+    def clear(self):
+        """ Remove every session.
+        """
+        for shard in self.shards:
+            with shard.lock:
+                shard.sessions.clear()
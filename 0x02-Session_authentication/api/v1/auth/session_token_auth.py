@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Signed Session Token Authentication module.
+"""
+from api.v1.auth.session_auth import SessionAuth
+from os import getenv
+from threading import Lock
+import base64
+import hashlib
+import heapq
+import hmac
+import os
+import time
+
+# key signing the tokens: share it between the workers of the API, a
+# random one per process only suits a single worker
+SESSION_SECRET = getenv('SESSION_SECRET', '').encode() or os.urandom(32)
+# lifetime of a token when SESSION_DURATION doesn't set one
+DEFAULT_DURATION = 24 * 3600
+
+
+def b64encode(data: bytes) -> str:
+    """ Return data in unpadded URL-safe base64.
+    """
+    return base64.urlsafe_b64encode(data).rstrip(b'=').decode()
+
+
+class SessionTokenAuth(SessionAuth):
+    """ Class to manage the API authentication with signed stateless
+    session tokens.
+
+    A token is "<user_id>.<expiry>.<nonce>.<signature>": the signature is
+    an HMAC-SHA256 of the rest under SESSION_SECRET, so that verifying it
+    takes no lookup and works in any worker sharing the secret. Logout
+    adds the signature of the token to a revocation list, until the
+    token would have expired anyway (SESSION_REVOCATION=0 disables it).
+
+    The revocation list belongs to the class, as the sessions of
+    SessionAuth: the logout view and the before_request hook may hold
+    different instances.
+    """
+    scheme = "session_token"
+    # expiry of the revoked tokens, by the first bytes of their
+    # signature, and the same as a heap of (expiry, key) to forget them
+    # once expired
+    revoked = {}
+    revoked_expiries = []
+    revoked_lock = Lock()
+
+    def __init__(self):
+        """ Initialize SessionTokenAuth.
+        """
+        super().__init__()
+        duration = int(getenv('SESSION_DURATION', 0))
+        self.session_duration = duration if duration > 0 \
+            else DEFAULT_DURATION
+        self.revocation = getenv('SESSION_REVOCATION', '1') == '1'
+
+    def sign(self, payload: str) -> str:
+        """ Return the signature of a token payload.
+        """
+        return b64encode(hmac.new(SESSION_SECRET, payload.encode(),
+                                  hashlib.sha256).digest())
+
+    def create_session(self, user_id: str = None) -> str:
+        """ Create a signed token for user_id.
+        """
+        if user_id is None or type(user_id) is not str or '.' in user_id:
+            return None
+        expires = int(time.time()) + self.session_duration
+        payload = "{}.{}.{}".format(user_id, expires, b64encode(os.urandom(9)))
+        with self.session_counts_lock:
+            self.session_counts["created"] += 1
+        return "{}.{}".format(payload, self.sign(payload))
+
+    def verify(self, session_id: str) -> tuple:
+        """ Return the (user_id, expiry, signature) of a valid token, None
+        if it is forged, malformed or expired.
+        """
+        if session_id is None or type(session_id) is not str:
+            return None
+        parts = session_id.split('.')
+        if len(parts) != 4:
+            return None
+        user_id, expires, nonce, signature = parts
+        payload = "{}.{}.{}".format(user_id, expires, nonce)
+        if not hmac.compare_digest(signature, self.sign(payload)):
+            return None
+        if not expires.isdigit() or int(expires) <= time.time():
+            return None
+        return user_id, int(expires), signature
+
+    def user_id_for_session_id(self, session_id: str = None) -> str:
+        """ Retrieve the user_id of a valid, unrevoked token.
+        """
+        token = self.verify(session_id)
+        if token is None:
+            return None
+        user_id, _, signature = token
+        if self.revoked and signature[:16] in self.revoked:
+            return None
+        return user_id
+
+    def destroy_session(self, request=None) -> bool:
+        """ Revoke the token of the request (logout).
+        """
+        token = self.verify(self.session_cookie(request))
+        if token is None or not self.revocation:
+            return False
+        _, expires, signature = token
+        now = time.time()
+        key = signature[:16]
+        with self.revoked_lock:
+            if key in self.revoked:
+                return False
+            # the expired tokens are refused anyway: forget them
+            expiries = self.revoked_expiries
+            while expiries and expiries[0][0] <= now:
+                del self.revoked[heapq.heappop(expiries)[1]]
+            self.revoked[key] = expires
+            heapq.heappush(expiries, (expires, key))
+        with self.session_counts_lock:
+            self.session_counts["destroyed"] += 1
+        return True
+
+    def session_stats(self) -> dict:
+        """ Return the tokens created and revoked since start, and the
+        number of revoked tokens not expired yet.
+        """
+        with self.session_counts_lock:
+            stats = dict(self.session_counts)
+        stats["revoked"] = len(self.revoked)
+        return stats
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+""" Module of Index views
+"""
+from flask import jsonify, abort
+from api.v1.views import app_views
+
+
+@app_views.route('/status', methods=['GET'], strict_slashes=False)
+def status() -> str:
+    """ GET /api/v1/status
+    Return:
+      - the status of the API
+    """
+    return jsonify({"status": "OK"})
+
+
+@app_views.route('/stats/', strict_slashes=False)
+def stats() -> str:
+    """ GET /api/v1/stats
+    Return:
+      - the number of each objects
+      - the users created per day, and with or without a name
+      - the active, created and destroyed sessions, with session auth
+      - the hits and misses of the credential cache, with basic auth
+      - the hit ratio of the session cache, with session DB auth
+      - the login attempts throttled, rejected before any hashing
+    All maintained on every change: nothing is scanned here.
+    """
+    from models.user import User
+    from api.v1.app import auth
+    from api.v1.auth.throttle import THROTTLE
+    stats = {}
+    stats['users'] = User.count()
+    user_stats = User.stats()
+    stats['users_created_per_day'] = user_stats['created_per_day']
+    stats['users_with_name'] = user_stats['with_name'].get(True, 0)
+    stats['users_without_name'] = user_stats['with_name'].get(False, 0)
+    if hasattr(auth, 'session_stats'):
+        stats['sessions'] = auth.session_stats()
+    if hasattr(auth, 'cache_stats'):
+        stats['credential_cache'] = auth.cache_stats()
+    if hasattr(auth, 'session_cache_stats'):
+        stats['session_cache'] = auth.session_cache_stats()
+    stats['throttle'] = THROTTLE.stats()
+    return jsonify(stats)
+
+
+@app_views.route('/forbidden', methods=['GET'], strict_slashes=False)
+def test_forbidden() -> str:
+    """ GET /api/v1/forbidden
+    Return:
+      - Raise error
+    """
+    return abort(403)
+
+
+@app_views.route('/unauthorized', methods=['GET'], strict_slashes=False)
+def test_unathourized() -> str:
+    """ GET /api/v1/unauthorized
+    Return:
+      - Raise error
+    """
+    return abort(401)
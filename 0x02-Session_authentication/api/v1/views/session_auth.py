@@ -2,13 +2,12 @@
 """
 Session Authentication module.
 """
-from flask import Flask, request, jsonify, make_response
+from flask import request, jsonify, make_response, abort
+from api.v1.auth.throttle import THROTTLE, keys_of
 from api.v1.views import app_views
 from models.user import User
 from os import getenv
 
-app = Flask(__name__)
-
 
 @app_views.route('/auth_session/login', methods=['POST'], strict_slashes=False)
 def session_login() -> str:
@@ -26,17 +25,40 @@ def session_login() -> str:
     if not password:
         return make_response(jsonify({"error": "password missing"}), 400)
 
+    keys = keys_of(request.remote_addr, email)
+    if not THROTTLE.allow(*keys):
+        return make_response(jsonify({"error": "too many attempts"}), 429)
+
     user = User.search({'email': email})
     
     if not user:
+        THROTTLE.failure(*keys)
         return make_response(jsonify({"error": "no user found for this email"}), 404)
 
     if not user[0].is_valid_password(password):
+        THROTTLE.failure(*keys)
         return make_response(jsonify({"error": "wrong password"}), 401)
 
-    auth = app.auth.create_session(user[0].id)
+    user[0].upgrade_password(password)
+
+    from api.v1.app import auth
+    session_id = auth.create_session(user[0].id)
     user_dict = user[0].to_json()
     response = make_response(jsonify(user_dict))
-    response.set_cookie(getenv('SESSION_NAME'), auth)
+    response.set_cookie(getenv('SESSION_NAME'), session_id)
 
     return response
+
+
+@app_views.route('/auth_session/logout', methods=['DELETE'],
+                 strict_slashes=False)
+def session_logout() -> str:
+    """ Handle Session Authentication logout.
+
+    Returns:
+        An empty JSON dictionary, 404 without a session to destroy.
+    """
+    from api.v1.app import auth
+    if not auth.destroy_session(request):
+        abort(404)
+    return jsonify({}), 200
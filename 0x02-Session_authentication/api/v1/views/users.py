@@ -1,33 +1,131 @@
 #!/usr/bin/env python3
 """ Module of Users views
 """
+from api.v1.auth.context import auth_context
 from api.v1.views import app_views
-from flask import abort, jsonify, request
+from flask import abort, jsonify, request, Response
 from models.user import User
+import base64
+import binascii
+import json
+
+# largest limit of one page, and number of users read at once when
+# streaming
+MAX_PAGE_SIZE = 1000
+STREAM_CHUNK = 1000
+# largest number of users of one POST /api/v1/users/bulk: each password
+# is a PBKDF2 hash (about 25 ms at the default PASSWORD_ITERATIONS on one
+# core) computed within the request, so 100 users take a few seconds at
+# most, less with several cores
+MAX_BULK_SIZE = 100
+
+
+def encode_cursor(user_id: str) -> str:
+    """ Return the opaque cursor of the page following user_id
+    """
+    return base64.urlsafe_b64encode(user_id.encode()).decode()
+
+
+def decode_cursor(cursor: str) -> str:
+    """ Return the user id encoded in cursor, None if it isn't valid:
+    characters outside the URL-safe alphabet are rejected, not skipped
+    """
+    try:
+        user_id = base64.b64decode(cursor.encode(), altchars=b'-_',
+                                   validate=True).decode()
+    except (binascii.Error, UnicodeError, ValueError):
+        return None
+    if not user_id:
+        return None
+    return user_id
+
+
+def stream_users(after: str = None):
+    """ Yield one NDJSON line per user following the id after, reading
+    STREAM_CHUNK records at a time without building the users
+    """
+    while True:
+        users = User.page_json(after, STREAM_CHUNK)
+        for user in users:
+            yield json.dumps(user) + "\n"
+        if len(users) < STREAM_CHUNK:
+            return
+        after = users[-1]['id']
 
 
 @app_views.route('/users', methods=['GET'], strict_slashes=False)
 def view_all_users() -> str:
     """ GET /api/v1/users
+    Query parameters (optional):
+      - limit: number of users of the page, at most MAX_PAGE_SIZE
+      - cursor: next_cursor of the previous page
+      - format: "ndjson" to stream one User JSON per line
     Return:
       - list of all User objects JSON represented
+      - with limit or cursor, {"users": [...], "next_cursor": ...},
+        next_cursor being null on the last page
+      - with format=ndjson, the users in id order, the next cursor in
+        the X-Next-Cursor header when limit is set
+      - 400 if limit or cursor is invalid
     """
-    all_users = [user.to_json() for user in User.all()]
-    return jsonify(all_users)
+    limit = request.args.get('limit')
+    cursor = request.args.get('cursor')
+    after = None
+    if cursor is not None:
+        after = decode_cursor(cursor)
+        if after is None:
+            abort(400)
+    if limit is not None:
+        try:
+            limit = int(limit)
+        except ValueError:
+            limit = 0
+        if limit < 1 or limit > MAX_PAGE_SIZE:
+            return jsonify({'error': "limit must be between 1 and {}"
+                            .format(MAX_PAGE_SIZE)}), 400
+    elif cursor is not None:
+        limit = MAX_PAGE_SIZE
+
+    if request.args.get('format') == 'ndjson' and limit is None:
+        return Response(stream_users(after), mimetype='application/x-ndjson')
+    if limit is None:
+        all_users = [user.to_json() for user in User.all()]
+        return jsonify(all_users)
+
+    # one extra user tells whether there is a next page
+    if request.args.get('format') == 'ndjson':
+        users = User.page_json(after, limit + 1)
+        response = Response("".join(json.dumps(user) + "\n"
+                                    for user in users[:limit]),
+                            mimetype='application/x-ndjson')
+        if len(users) > limit:
+            response.headers['X-Next-Cursor'] = encode_cursor(
+                users[limit - 1]['id'])
+        return response
+    users = User.page(after, limit + 1)
+    next_cursor = None
+    if len(users) > limit:
+        users = users[:limit]
+        next_cursor = encode_cursor(users[-1].id)
+    return jsonify({'users': [user.to_json() for user in users],
+                    'next_cursor': next_cursor})
 
 
 @app_views.route('/users/<user_id>', methods=['GET'], strict_slashes=False)
 def view_one_user(user_id: str = None) -> str:
     """ GET /api/v1/users/:id
     Path parameter:
-      - User ID
+      - User ID, or "me" for the authenticated user
     Return:
       - User object JSON represented
       - 404 if the User ID doesn't exist
     """
     if user_id is None:
         abort(404)
-    user = User.get(user_id)
+    if user_id == "me":
+        user = auth_context(request).user
+    else:
+        user = User.get(user_id)
     if user is None:
         abort(404)
     return jsonify(user.to_json())
@@ -64,29 +162,86 @@ def create_user() -> str:
       - 400 if can't create the new User
     """
     rj = None
-    error_msg = None
     try:
         rj = request.get_json()
     except Exception as e:
         rj = None
-    if rj is None:
-        error_msg = "Wrong format"
-    if error_msg is None and rj.get("email", "") == "":
-        error_msg = "email missing"
-    if error_msg is None and rj.get("password", "") == "":
-        error_msg = "password missing"
-    if error_msg is None:
+    try:
+        user = user_from_json(rj)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    try:
+        user.save()
+        return jsonify(user.to_json()), 201
+    except Exception as e:
+        return jsonify({'error': "Can't create User: {}".format(e)}), 400
+
+
+def user_from_json(rj: object, with_password: bool = True) -> User:
+    """ Return a new User from the JSON body of a creation, for both
+    POST /api/v1/users and POST /api/v1/users/bulk, or raise ValueError
+    with the error message to send back
+
+    Without with_password, the password is checked but left unset, for
+    User.set_passwords() to hash it along with the others.
+    """
+    if type(rj) is not dict:
+        raise ValueError("Wrong format")
+    if rj.get("email", "") == "":
+        raise ValueError("email missing")
+    if rj.get("password", "") == "":
+        raise ValueError("password missing")
+    user = User()
+    user.email = rj.get("email")
+    if with_password:
+        user.password = rj.get("password")
+    user.first_name = rj.get("first_name")
+    user.last_name = rj.get("last_name")
+    return user
+
+
+@app_views.route('/users/bulk', methods=['POST'], strict_slashes=False)
+def create_users() -> str:
+    """ POST /api/v1/users/bulk
+    JSON body:
+      - list of at most MAX_BULK_SIZE users, each with the JSON body of
+        POST /api/v1/users
+    Return:
+      - {"created": [...], "errors": [...]}: the User objects JSON
+        represented, and an {"index", "error"} object for each user of
+        the list that couldn't be created; the passwords of all valid
+        users are hashed in parallel, and the users saved at once
+      - 201 if at least one User was created, 400 otherwise
+    """
+    rj = None
+    try:
+        rj = request.get_json()
+    except Exception as e:
+        rj = None
+    if type(rj) is not list:
+        return jsonify({'error': "Wrong format"}), 400
+    if len(rj) > MAX_BULK_SIZE:
+        return jsonify({'error': "At most {} users at once"
+                        .format(MAX_BULK_SIZE)}), 400
+    users = []
+    pwds = []
+    errors = []
+    for i, user_json in enumerate(rj):
+        try:
+            users.append(user_from_json(user_json, with_password=False))
+            pwds.append(user_json.get("password"))
+        except ValueError as e:
+            errors.append({'index': i, 'error': str(e)})
+    if len(users) > 0:
         try:
-            user = User()
-            user.email = rj.get("email")
-            user.password = rj.get("password")
-            user.first_name = rj.get("first_name")
-            user.last_name = rj.get("last_name")
-            user.save()
-            return jsonify(user.to_json()), 201
+            User.set_passwords(users, pwds)
+            User.save_many(users)
         except Exception as e:
-            error_msg = "Can't create User: {}".format(e)
-    return jsonify({'error': error_msg}), 400
+            return jsonify({'error': "Can't create Users: {}".format(e),
+                            'errors': errors}), 400
+    result = {'created': [user.to_json() for user in users],
+              'errors': errors}
+    return jsonify(result), 201 if len(users) > 0 else 400
 
 
 @app_views.route('/users/<user_id>', methods=['PUT'], strict_slashes=False)
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+""" Benchmark of SessionDBAuth with and without its session cache: logins/s,
+lookups/s of known and unknown Session IDs, the hit ratio, and the
+sessions refused after a logout
+"""
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+
+SESSIONS = 2000
+LOOKUPS = 50000
+
+
+class Request:
+    """ What the auth reads of a request: its cookies
+    """
+
+    def __init__(self, session_id: str):
+        """ Initialize a request sending session_id
+        """
+        self.cookies = {os.environ["SESSION_NAME"]: session_id}
+        self.headers = {}
+
+
+def rate(count: int, run) -> float:
+    """ Return the calls/s of run(i) for i in range(count)
+    """
+    start = time.perf_counter()
+    for i in range(count):
+        run(i)
+    return count / (time.perf_counter() - start)
+
+
+def child():
+    """ Print the logins/s, the lookups/s of known and unknown sessions,
+    the hit ratio and the destroyed sessions still accepted
+    """
+    from api.v1.auth.session_db_auth import SessionDBAuth
+
+    auth = SessionDBAuth()
+    session_ids = []
+    logins = rate(SESSIONS, lambda i: session_ids.append(
+        auth.create_session("user-{}".format(i))))
+    unknown_ids = [str(uuid.uuid4()) for _ in range(100)]
+    known = rate(LOOKUPS, lambda i: auth.user_id_for_session_id(
+        session_ids[i % SESSIONS]))
+    unknown = rate(LOOKUPS, lambda i: auth.user_id_for_session_id(
+        unknown_ids[i % 100]))
+    accepted = 0
+    for session_id in session_ids[:100]:
+        auth.destroy_session(Request(session_id))
+        if auth.user_id_for_session_id(session_id) is not None:
+            accepted += 1
+    print("{:.0f} {:.0f} {:.0f} {} {}".format(
+        logins, known, unknown, auth.session_cache_stats()["hit_ratio"],
+        accepted))
+
+
+if __name__ == "__main__":
+    if len(sys.argv) == 2 and sys.argv[1] == "--child":
+        child()
+        sys.exit(0)
+
+    root = os.path.dirname(os.path.abspath(__file__))
+    print("{:>6} {:>9} {:>9} {:>9} {:>9} {:>9}".format(
+        "cache", "logins/s", "known/s", "unknown/s", "hit ratio",
+        "accepted"))
+    for size in ("0", "10000"):
+        env = dict(os.environ, PYTHONPATH=root, SESSION_CACHE_SIZE=size,
+                   SESSION_NAME="_my_session_id", SESSION_DURATION="3600",
+                   SESSION_SWEEP_INTERVAL="0")
+        out = subprocess.check_output(
+            [sys.executable, os.path.join(root, "bench_session_cache.py"),
+             "--child"], env=env, cwd=tempfile.mkdtemp()).decode().split()
+        print("{:>6} {:>9} {:>9} {:>9} {:>9} {:>9}".format(size, *out))
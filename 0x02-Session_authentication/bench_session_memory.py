@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+""" Memory of SessionExpAuth over a simulated day of logins, with the
+expired sessions only refused (no sweep), swept, and swept with a
+SESSION_MAX limit
+"""
+import os
+import sys
+import tracemalloc
+
+DAY = 24 * 3600
+DURATION = 3600
+
+
+def simulate(mode: str, logins_per_second: float) -> list:
+    """ Return the sessions kept and the MB allocated at each simulated
+    hour of a day of logins
+    """
+    from api.v1.auth.session_exp_auth import SessionExpAuth, \
+        SessionExpirations
+    from api.v1.auth.session_map import SessionMap
+
+    auth = SessionExpAuth()
+    # sessions of this mode only, not the ones shared by the class
+    auth.user_id_by_session_id = SessionMap()
+    auth.expirations = SessionExpirations()
+    clock = [1700000000.0]
+    auth.clock = lambda: clock[0]
+    if mode == "no sweep":
+        auth.sweep = lambda: 0
+    elif mode == "sweep + max":
+        auth.max_sessions = int(DURATION * logins_per_second / 2)
+
+    hours = []
+    step = 1 / logins_per_second
+    tracemalloc.start()
+    start = clock[0]
+    next_hour = start + 3600
+    while clock[0] < start + DAY:
+        auth.create_session("user-{}".format(int(clock[0]) % 1000))
+        clock[0] += step
+        if clock[0] >= next_hour:
+            hours.append((len(auth.user_id_by_session_id),
+                          tracemalloc.get_traced_memory()[0] / 2 ** 20))
+            next_hour += 3600
+    tracemalloc.stop()
+    return hours
+
+
+if __name__ == "__main__":
+    rate = float(sys.argv[1]) if len(sys.argv) > 1 else 2
+    os.environ.update(SESSION_DURATION=str(DURATION),
+                      SESSION_SWEEP_INTERVAL="0", SESSION_NAME="_my_session")
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    print("{} logins/s for a day, sessions of {} s".format(rate, DURATION))
+    print("{:>12} {:>10} {:>10} {:>10} {:>10}".format(
+        "mode", "sessions", "MB at 1h", "MB at 12h", "MB at 24h"))
+    for mode in ("no sweep", "sweep", "sweep + max"):
+        hours = simulate(mode, rate)
+        print("{:>12} {:>10} {:>10.1f} {:>10.1f} {:>10.1f}".format(
+            mode, hours[-1][0], hours[0][1], hours[11][1], hours[-1][1]))
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+""" Benchmark of SessionExpAuth at one million live sessions: lookups/s
+of user_id_for_session_id() and bytes per session, against the dict
+records with a formatted created_at parsed on every lookup
+"""
+from datetime import datetime, timedelta
+import gc
+import os
+import sys
+import time
+import tracemalloc
+
+LOOKUPS = 200000
+DURATION = 3600
+
+
+def dict_sessions(size: int) -> dict:
+    """ Return size sessions as the former dict records
+    """
+    from uuid import uuid4
+
+    return {str(uuid4()): {"user_id": str(uuid4()),
+                           "created_at": datetime.now().strftime(
+                               "%Y-%m-%d %H:%M:%S")}
+            for _ in range(size)}
+
+
+def dict_lookup(sessions: dict, session_id: str) -> str:
+    """ Return the user_id of a session the former way
+    """
+    session_dict = sessions.get(session_id)
+    if session_dict is None:
+        return None
+    created_at = datetime.strptime(session_dict["created_at"],
+                                   "%Y-%m-%d %H:%M:%S")
+    if created_at + timedelta(seconds=DURATION) < datetime.now():
+        return None
+    return session_dict["user_id"]
+
+
+def record_sessions(size: int):
+    """ Return a SessionExpAuth holding size sessions
+    """
+    from api.v1.auth.session_exp_auth import SessionExpAuth
+    from uuid import uuid4
+
+    auth = SessionExpAuth()
+    for _ in range(size):
+        auth.create_session(str(uuid4()))
+    return auth
+
+
+def measure(build, lookup, size: int) -> tuple:
+    """ Return the bytes per session and the lookups/s of the sessions
+    made by build(size), looked up by lookup(sessions, session_id)
+    """
+    gc.collect()
+    tracemalloc.start()
+    sessions = build(size)
+    used = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    store = getattr(sessions, "user_id_by_session_id", sessions)
+    session_ids = list(store)[:1000]
+    start = time.perf_counter()
+    for i in range(LOOKUPS):
+        if lookup(sessions, session_ids[i % 1000]) is None:
+            raise ValueError("Session not found")
+    return used / size, LOOKUPS / (time.perf_counter() - start)
+
+
+if __name__ == "__main__":
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+    os.environ.update(SESSION_DURATION=str(DURATION),
+                      SESSION_SWEEP_INTERVAL="0", SESSION_NAME="_my_session")
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    print("{:>9} {:>9} {:>17} {:>10}".format(
+        "sessions", "records", "bytes per session", "lookups/s"))
+    for name, build, lookup in (
+            ("dict", dict_sessions, dict_lookup),
+            ("slotted", record_sessions,
+             lambda auth, session_id: auth.user_id_for_session_id(
+                 session_id))):
+        per_session, rate = measure(build, lookup, size)
+        print("{:>9} {:>9} {:>17.0f} {:>10.0f}".format(
+            size, name, per_session, rate))
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+""" Stress benchmark of the session store under request threads: each
+thread creates, looks up and destroys sessions of its own user, and all
+of them race to destroy the same sessions. Prints the operations/s by
+number of threads and shards, and the inconsistencies found
+"""
+import os
+import sys
+import threading
+import time
+
+OPERATIONS = 30000
+LIVE = 100
+SHARED = 2000
+
+
+class Request:
+    """ What the auth reads of a request: its cookies
+    """
+
+    def __init__(self, session_id: str):
+        """ Initialize a request sending session_id
+        """
+        self.cookies = {os.environ["SESSION_NAME"]: session_id}
+        self.headers = {}
+
+
+def worker(auth, user_id: str, shared: list, barrier, errors: list,
+           results: list):
+    """ Run OPERATIONS operations for user_id, then destroy the shared
+    sessions, appending the inconsistencies to errors and the sessions
+    destroyed to results
+    """
+    live = []
+    created = destroyed = 0
+    barrier.wait()
+    for i in range(OPERATIONS // 3):
+        session_id = auth.create_session(user_id)
+        created += 1
+        live.append(session_id)
+        if auth.user_id_for_session_id(live[i % len(live)]) != user_id:
+            errors.append("lookup of a live session")
+        if len(live) > LIVE:
+            session_id = live.pop(0)
+            if not auth.destroy_session(Request(session_id)):
+                errors.append("destroy of a live session")
+            destroyed += 1
+            if auth.user_id_for_session_id(session_id) is not None:
+                errors.append("lookup of a destroyed session")
+    won = sum(auth.destroy_session(Request(session_id))
+              for session_id in shared)
+    results.append((created, destroyed, won, len(live)))
+
+
+def run(auth_class, threads: int, shards: int) -> tuple:
+    """ Return the operations/s of threads workers on a new auth_class
+    with shards shards, and the inconsistencies found
+    """
+    from api.v1.auth.session_exp_auth import SessionExpirations
+    from api.v1.auth.session_map import SessionMap
+
+    auth = auth_class()
+    # sessions and counters of this run only, not the ones shared by
+    # the class
+    auth.user_id_by_session_id = SessionMap(shards)
+    auth.expirations = SessionExpirations()
+    auth.session_counts = dict.fromkeys(auth.session_counts, 0)
+    shared = [auth.create_session("shared") for _ in range(SHARED)]
+    barrier = threading.Barrier(threads + 1)
+    errors = []
+    results = []
+    workers = [threading.Thread(target=worker,
+                                args=(auth, "user-{}".format(i), shared,
+                                      barrier, errors, results))
+               for i in range(threads)]
+    for thread in workers:
+        thread.start()
+    barrier.wait()
+    start = time.perf_counter()
+    for thread in workers:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    won = sum(result[2] for result in results)
+    if won != SHARED:
+        errors.append("{} shared sessions destroyed".format(won))
+    live = sum(result[3] for result in results)
+    if len(auth.user_id_by_session_id) != live:
+        errors.append("{} sessions for {} live".format(
+            len(auth.user_id_by_session_id), live))
+    stats = auth.session_stats()
+    if stats["created"] - stats["destroyed"] != live:
+        errors.append("counters {}".format(stats))
+    return threads * (OPERATIONS // 3) * 3 / elapsed, len(errors)
+
+
+if __name__ == "__main__":
+    os.environ.update(SESSION_DURATION="3600", SESSION_SWEEP_INTERVAL="0",
+                      SESSION_NAME="_my_session_id")
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    from api.v1.auth.session_auth import SessionAuth
+    from api.v1.auth.session_exp_auth import SessionExpAuth
+
+    print("{:>16} {:>7} {:>6} {:>12} {:>7}".format(
+        "auth", "threads", "shards", "operations/s", "errors"))
+    for auth_class in (SessionAuth, SessionExpAuth):
+        for threads in (1, 4, 16):
+            for shards in (1, 16):
+                rate, errors = run(auth_class, threads, shards)
+                print("{:>16} {:>7} {:>6} {:>12.0f} {:>7}".format(
+                    auth_class.__name__, threads, shards, rate, errors))
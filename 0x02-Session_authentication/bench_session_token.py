@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+""" Benchmark of the requests/s of session authentication: the user of a
+session cookie with SessionDBAuth (UserSession lookups behind its
+session cache), SessionAuth (an in-memory lookup) and SessionTokenAuth
+(a signature check only)
+"""
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+USERS = 1000
+REQUESTS = 20000
+AUTH_TYPES = {
+    "session_db_auth": ("api.v1.auth.session_db_auth", "SessionDBAuth"),
+    "session_auth": ("api.v1.auth.session_auth", "SessionAuth"),
+    "session_token_auth": ("api.v1.auth.session_token_auth",
+                           "SessionTokenAuth"),
+}
+
+
+class Request:
+    """ What the auth reads of a request: its cookies
+    """
+
+    def __init__(self, session_id: str):
+        """ Initialize a request sending session_id
+        """
+        self.cookies = {os.environ["SESSION_NAME"]: session_id}
+        self.headers = {}
+
+
+def child(auth_type: str):
+    """ Print the requests/s and the requests not authenticated
+    """
+    import importlib
+    from models.user import User
+
+    module, name = AUTH_TYPES[auth_type]
+    auth = getattr(importlib.import_module(module), name)()
+    users = [User(email="user{}@hbtn.io".format(i)) for i in range(USERS)]
+    User.save_many(users)
+    requests = [Request(auth.create_session(user.id)) for user in users]
+
+    failed = 0
+    start = time.perf_counter()
+    for i in range(REQUESTS):
+        if auth.current_user(requests[i % USERS]) is None:
+            failed += 1
+    elapsed = time.perf_counter() - start
+    print("{:.0f} {}".format(REQUESTS / elapsed, failed))
+
+
+if __name__ == "__main__":
+    if len(sys.argv) == 3 and sys.argv[1] == "--child":
+        child(sys.argv[2])
+        sys.exit(0)
+
+    root = os.path.dirname(os.path.abspath(__file__))
+    print("{:>20} {:>11} {:>7}".format("AUTH_TYPE", "requests/s", "failed"))
+    for auth_type in AUTH_TYPES:
+        env = dict(os.environ, PYTHONPATH=root, AUTH_TYPE=auth_type,
+                   SESSION_NAME="_my_session_id", SESSION_DURATION="3600")
+        out = subprocess.check_output(
+            [sys.executable, os.path.join(root, "bench_session_token.py"),
+             "--child", auth_type], env=env,
+            cwd=tempfile.mkdtemp()).decode().split()
+        print("{:>20} {:>11} {:>7}".format(auth_type, *out))
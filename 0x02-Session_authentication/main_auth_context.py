@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+""" Check that one authenticated request looks its session and its user
+up once, however many hooks and views read request.auth_context
+"""
+import os
+import tempfile
+
+LOOKUPS = {"session": 0, "user": 0}
+
+
+def counted(name: str, method):
+    """ Return method counting its calls in LOOKUPS[name]
+    """
+    def wrapper(*args, **kwargs):
+        LOOKUPS[name] += 1
+        return method(*args, **kwargs)
+    return wrapper
+
+
+if __name__ == "__main__":
+    # the app reads AUTH_TYPE when imported
+    os.environ["AUTH_TYPE"] = "session_auth"
+    os.environ["SESSION_NAME"] = "_my_session_id"
+    os.chdir(tempfile.mkdtemp())
+    from api.v1.app import app, auth
+    from api.v1.auth.session_auth import SessionAuth
+    from models.user import User
+
+    user = User(email="bob@hbtn.io")
+    user.password = "H0lbertonSchool98!"
+    user.save()
+
+    client = app.test_client()
+    response = client.post("/api/v1/auth_session/login",
+                           data={"email": "bob@hbtn.io",
+                                 "password": "H0lbertonSchool98!"})
+    print("login:", response.status_code)
+    assert response.status_code == 200
+
+    SessionAuth.user_id_for_session_id = counted(
+        "session", SessionAuth.user_id_for_session_id)
+    User.get = counted("user", User.get)
+    for path in ("/api/v1/users/me", "/api/v1/users/me", "/api/v1/users"):
+        LOOKUPS.update(session=0, user=0)
+        response = client.get(path)
+        print("{}: {}, {} session lookup(s), {} user lookup(s)".format(
+            path, response.status_code, LOOKUPS["session"], LOOKUPS["user"]))
+        assert response.status_code == 200
+        assert LOOKUPS == {"session": 1, "user": 1}, LOOKUPS
+    print("scheme:", auth.scheme)
+    assert auth.scheme == "session"
+    print("OK")
@@ -0,0 +1,495 @@
+#!/usr/bin/env python3
+""" Storage backends module
+
+A backend persists the records of each Base class (the dictionaries
+returned by to_json(True)), keyed by class name and object id:
+- load() yields the (op, id, record) changes rebuilding the stored
+  state, op being "save" or "remove"
+- apply() writes a list of (op, id, JSON text of the record) changes,
+  the text being None for "remove"
+- dump() replaces the whole content of a class with (id, JSON text)
+  pairs
+Backends with row_level = True write a change in constant time, the
+others are only used through dump(). compact() folds the changes
+written so far into the stored state, when the backend accumulates
+them, and journal_size() tells how much has accumulated.
+
+With multiprocess set, several processes share the same storage:
+- locked() is held around a process catching up and writing
+- changes() returns the changes written by other processes since the
+  last load(), changes() or apply() of this one, or None when the
+  whole class has to be loaded again
+"""
+from contextlib import contextmanager
+from os import path
+from typing import Iterable, Iterator, List, Tuple
+import fcntl
+import json
+import os
+import sqlite3
+import threading
+
+from models.binsnapshot import read_snapshot, write_snapshot
+from models.jsonstream import JSONObjectReader, intern_keys
+
+
+class JSONFileBackend():
+    """ .db_<Class>.json snapshot files (.db_<Class>.bin in the binary
+    format of models.binsnapshot), with an optional append-only
+    .db_<Class>.log journal replayed on top of the snapshot
+
+    compact() rotates the journal to .db_<Class>.log.1 and folds it
+    into a new snapshot while writes go on in a new journal; until
+    then, load() replays .log.1 before .log.
+    """
+
+    def __init__(self, journal: bool = False, multiprocess: bool = False,
+                 binary: bool = False,
+                 timestamps: Iterable[str] = ('created_at', 'updated_at')):
+        """ Initialize the backend, row-level when journal is set
+
+        Processes see each other's changes through the journal, so
+        multiprocess turns it on. binary writes snapshots in the binary
+        format, with the timestamps fields stored as integers.
+        """
+        self.row_level = journal or multiprocess
+        self.multiprocess = multiprocess
+        self.binary = binary
+        self.timestamps = tuple(timestamps)
+        # (inode, offset) of the journal read so far, by class
+        self._positions = {}
+        # size of the journal after the last apply(), by class
+        self._journal_sizes = {}
+        # held around the journal rotation and the writes of this process
+        self._lock = threading.RLock()
+        # classes whose file lock the current thread holds
+        self._held = threading.local()
+
+    @contextmanager
+    def locked(self, s_class: str, shared: bool = False):
+        """ Hold the .db_<Class>.lock file lock (multiprocess only)
+
+        A thread already holding the lock of the class keeps it: a
+        second flock() on another descriptor would wait for itself.
+        """
+        held = self._held.__dict__.setdefault('classes', set())
+        if not self.multiprocess or s_class in held:
+            yield
+            return
+        with open(".db_{}.lock".format(s_class), 'a') as f:
+            fcntl.flock(f, fcntl.LOCK_SH if shared else fcntl.LOCK_EX)
+            held.add(s_class)
+            try:
+                yield
+            finally:
+                held.discard(s_class)
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    @staticmethod
+    def _parse_journal(lines: Iterable[bytes]) -> Iterator[tuple]:
+        """ Yield the (op, id, record, line size) of journal lines,
+        stopping at the first torn one
+        """
+        for line in lines:
+            if not line.endswith(b"\n"):
+                return
+            try:
+                record = json.loads(line, object_pairs_hook=intern_keys)
+            except ValueError:
+                return
+            if record.get('op') == 'remove':
+                yield 'remove', record.get('id'), None, len(line)
+            else:
+                obj_json = record.get('obj')
+                yield 'save', obj_json.get('id'), obj_json, len(line)
+
+    def _snapshot_paths(self, s_class: str) -> List[str]:
+        """ Return the snapshot paths of the class, the one of the
+        configured format first
+        """
+        paths = [".db_{}.json".format(s_class), ".db_{}.bin".format(s_class)]
+        if self.binary:
+            paths.reverse()
+        return paths
+
+    def _read_snapshot(self, s_class: str) -> Iterator[Tuple[str, dict]]:
+        """ Stream the (id, record) pairs of the snapshot, in whichever
+        format it was written
+        """
+        for file_path in self._snapshot_paths(s_class):
+            if not path.exists(file_path):
+                continue
+            if file_path.endswith(".bin"):
+                with open(file_path, 'rb') as f:
+                    yield from read_snapshot(f)
+            else:
+                with open(file_path, 'r') as f:
+                    yield from JSONObjectReader(f)
+            return
+
+    def _write_snapshot(self, s_class: str,
+                        records: Iterable[Tuple[str, object]]) -> str:
+        """ Write (id, record or JSON text) pairs to a temporary file in
+        the configured format and return its path
+        """
+        file_path = self._snapshot_paths(s_class)[0]
+        tmp_path = "{}.{}.{}.tmp".format(file_path, os.getpid(),
+                                         threading.get_ident())
+        if self.binary:
+            with open(tmp_path, 'wb') as f:
+                write_snapshot(f, ((obj_id, json.loads(obj)
+                                    if type(obj) is str else obj)
+                                   for obj_id, obj in records),
+                               self.timestamps)
+            return tmp_path
+        with open(tmp_path, 'w') as f:
+            f.write("{")
+            separator = ""
+            for obj_id, obj in records:
+                if type(obj) is not str:
+                    obj = json.dumps(obj)
+                f.write('{}{}: {}'.format(separator, json.dumps(obj_id), obj))
+                separator = ", "
+            f.write("}")
+        return tmp_path
+
+    def _install_snapshot(self, s_class: str, tmp_path: str):
+        """ Move a snapshot written by _write_snapshot() in place, and
+        drop the snapshot of the other format and the rotated journal
+        it replaces
+        """
+        file_path, other_path = self._snapshot_paths(s_class)
+        os.replace(tmp_path, file_path)
+        for stale_path in (other_path, ".db_{}.log.1".format(s_class)):
+            if path.exists(stale_path):
+                os.unlink(stale_path)
+
+    def load(self, s_class: str) -> Iterator[Tuple[str, str, dict]]:
+        """ Stream the snapshot, then replay the rotated journal and the
+        journal
+
+        A torn record at the tail of the journal (crash in the middle of
+        an append) is cut off so the next append starts on a clean line.
+        """
+        with self.locked(s_class, shared=True):
+            for obj_id, obj_json in self._read_snapshot(s_class):
+                yield 'save', obj_id, obj_json
+
+            rotated_path = ".db_{}.log.1".format(s_class)
+            if path.exists(rotated_path):
+                with open(rotated_path, 'rb') as f:
+                    for op, obj_id, obj_json, _ in self._parse_journal(f):
+                        yield op, obj_id, obj_json
+
+            journal_path = ".db_{}.log".format(s_class)
+            self._positions[s_class] = (None, 0)
+            self._journal_sizes[s_class] = 0
+            if not path.exists(journal_path):
+                return
+            valid_size = 0
+            with open(journal_path, 'rb') as f:
+                inode = os.fstat(f.fileno()).st_ino
+                for op, obj_id, obj_json, size in self._parse_journal(f):
+                    yield op, obj_id, obj_json
+                    valid_size += size
+
+            if valid_size < path.getsize(journal_path):
+                with open(journal_path, 'r+b') as f:
+                    f.truncate(valid_size)
+            self._positions[s_class] = (inode, valid_size)
+            self._journal_sizes[s_class] = valid_size
+
+    def changes(self, s_class: str) -> List[Tuple[str, str, dict]]:
+        """ Read the journal records appended since the last position,
+        None if the journal was replaced by a dump()
+        """
+        if not self.multiprocess:
+            return []
+        inode, offset = self._positions.get(s_class, (None, 0))
+        try:
+            stat = os.stat(".db_{}.log".format(s_class))
+        except FileNotFoundError:
+            return [] if inode is None else None
+        if inode is not None and stat.st_ino != inode:
+            return None
+        if stat.st_size == offset:
+            return []
+        if stat.st_size < offset:
+            return None
+
+        result = []
+        with open(".db_{}.log".format(s_class), 'rb') as f:
+            f.seek(offset)
+            for op, obj_id, obj_json, size in self._parse_journal(f):
+                result.append((op, obj_id, obj_json))
+                offset += size
+        self._positions[s_class] = (stat.st_ino, offset)
+        return result
+
+    def apply(self, s_class: str, changes: List[tuple]):
+        """ Append changes to the journal of the class, in one write
+        """
+        journal_path = ".db_{}.log".format(s_class)
+        lines = []
+        for op, obj_id, obj_text in changes:
+            if op == 'remove':
+                lines.append('{{"op": "remove", "id": {}}}\n'
+                             .format(json.dumps(obj_id)))
+            else:
+                lines.append('{{"op": "save", "obj": {}}}\n'
+                             .format(obj_text))
+        with self._lock, open(journal_path, 'ab') as f:
+            start = f.tell()
+            f.write("".join(lines).encode())
+            self._journal_sizes[s_class] = f.tell()
+            if self.multiprocess:
+                # our own records don't need to be read back
+                inode = os.fstat(f.fileno()).st_ino
+                position = self._positions.get(s_class, (None, 0))
+                if position == (inode, start) or \
+                        position == (None, 0) and start == 0:
+                    self._positions[s_class] = (inode, f.tell())
+
+    def dump(self, s_class: str, objs_text: Iterable[Tuple[str, str]]):
+        """ Write a new snapshot and empty the journal folded into it
+
+        The snapshot is written to a temporary file and moved in place.
+        """
+        with self._lock:
+            self._install_snapshot(s_class,
+                                   self._write_snapshot(s_class, objs_text))
+
+            # a new (empty) journal file tells other processes to reload
+            journal_path = ".db_{}.log".format(s_class)
+            tmp_path = "{}.{}.{}.tmp".format(journal_path, os.getpid(),
+                                             threading.get_ident())
+            open(tmp_path, 'w').close()
+            os.replace(tmp_path, journal_path)
+            self._positions[s_class] = (os.stat(journal_path).st_ino, 0)
+            self._journal_sizes[s_class] = 0
+
+    def journal_size(self, s_class: str) -> int:
+        """ Return the size in bytes of the journal not compacted yet,
+        as of the last load() or apply() of this process
+        """
+        return self._journal_sizes.get(s_class, 0)
+
+    def compact(self, s_class: str) -> bool:
+        """ Fold the journal into a new snapshot and return True, or
+        False if there was nothing to fold or another process or thread
+        replaced the snapshot meanwhile
+
+        The locks are only held to rotate the journal and to move the
+        new snapshot in place: reading the old state and writing the
+        new one run while writes go on.
+        """
+        journal_path = ".db_{}.log".format(s_class)
+        rotated_path = journal_path + ".1"
+        with self.locked(s_class), self._lock:
+            if not path.exists(rotated_path):
+                if not path.exists(journal_path) or \
+                        path.getsize(journal_path) == 0:
+                    return False
+                stat = os.stat(journal_path)
+                os.replace(journal_path, rotated_path)
+                self._journal_sizes[s_class] = 0
+                # caught up: nothing to read in the rotated journal
+                if self._positions.get(s_class) == (stat.st_ino,
+                                                    stat.st_size):
+                    self._positions[s_class] = (None, 0)
+            stat = os.stat(rotated_path)
+            rotated = (stat.st_ino, stat.st_size, stat.st_mtime_ns)
+
+        records = {}
+        try:
+            for obj_id, obj_json in self._read_snapshot(s_class):
+                records[obj_id] = obj_json
+            with open(rotated_path, 'rb') as f:
+                for op, obj_id, obj_json, _ in self._parse_journal(f):
+                    if op == 'remove':
+                        records.pop(obj_id, None)
+                    else:
+                        records[obj_id] = obj_json
+        except FileNotFoundError:
+            return False
+        tmp_path = self._write_snapshot(s_class, records.items())
+
+        with self.locked(s_class), self._lock:
+            try:
+                stat = os.stat(rotated_path)
+            except FileNotFoundError:
+                stat = None
+            if stat is None or \
+                    (stat.st_ino, stat.st_size, stat.st_mtime_ns) != rotated:
+                os.unlink(tmp_path)
+                return False
+            self._install_snapshot(s_class, tmp_path)
+        return True
+
+
+class SQLiteBackend():
+    """ One SQLite database, with a (id, data) table per class
+
+    With multiprocess set, every change also adds a (seq, class, id)
+    row to a _changes table, which other processes read from their last
+    seq; a NULL id there, written by dump(), asks for a full reload.
+    Each write of a class drops its rows older than the changes_log last
+    seqs, so the table stays bounded: a process lagging further behind
+    loads the whole class again instead.
+    """
+    row_level = True
+
+    def __init__(self, db_path: str, multiprocess: bool = False,
+                 changes_log: int = 10000):
+        """ Initialize the backend on the database file db_path
+        """
+        self.multiprocess = multiprocess
+        self.changes_log = changes_log
+        self._db = sqlite3.connect(db_path, timeout=30,
+                                   isolation_level=None,
+                                   check_same_thread=False)
+        self._lock = threading.Lock()
+        self._tables = set()
+        # last _changes seq read or written, by class
+        self._seqs = {}
+        if multiprocess:
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("CREATE TABLE IF NOT EXISTS _changes "
+                             "(seq INTEGER PRIMARY KEY AUTOINCREMENT, "
+                             "class TEXT NOT NULL, id TEXT)")
+            self._db.execute("CREATE INDEX IF NOT EXISTS _changes_class "
+                             "ON _changes (class, seq)")
+
+    @contextmanager
+    def locked(self, s_class: str, shared: bool = False):
+        """ Nothing to hold: each write is its own transaction, and
+        apply() tells whether this process was up to date
+        """
+        yield
+
+    @contextmanager
+    def _transaction(self, immediate: bool = True):
+        """ Run a block in one transaction, holding the write lock of
+        the database from the start when immediate is set
+        """
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE" if immediate else "BEGIN")
+            try:
+                yield
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                raise
+            self._db.execute("COMMIT")
+
+    def _table(self, s_class: str) -> str:
+        """ Return the quoted table name of a class, creating the table
+        """
+        table = '"{}"'.format(s_class.replace('"', '""'))
+        if s_class not in self._tables:
+            self._db.execute("CREATE TABLE IF NOT EXISTS {} "
+                             "(id TEXT PRIMARY KEY, data TEXT NOT NULL)"
+                             .format(table))
+            self._tables.add(s_class)
+        return table
+
+    def _last_seq(self, s_class: str) -> int:
+        """ Return the last _changes seq of the class
+        """
+        row = self._db.execute("SELECT max(seq) FROM _changes "
+                               "WHERE class = ?", (s_class,)).fetchone()
+        return row[0] or 0
+
+    def load(self, s_class: str) -> Iterator[Tuple[str, str, dict]]:
+        """ Stream all rows of the class
+        """
+        with self._transaction(immediate=False):
+            rows = self._db.execute("SELECT id, data FROM {}"
+                                    .format(self._table(s_class)))
+            for obj_id, data in rows:
+                yield 'save', obj_id, json.loads(
+                    data, object_pairs_hook=intern_keys)
+            if self.multiprocess:
+                self._seqs[s_class] = self._last_seq(s_class)
+
+    def changes(self, s_class: str) -> List[Tuple[str, str, dict]]:
+        """ Read the rows changed by other processes since the last seq,
+        None if a dump() replaced the class or if the rows following the
+        last seq were dropped from the log
+        """
+        if not self.multiprocess:
+            return []
+        result = []
+        with self._transaction(immediate=False):
+            if (self._seqs.get(s_class, 0) <
+                    self._last_seq(s_class) - self.changes_log):
+                return None
+            rows = self._db.execute(
+                "SELECT c.seq, c.id, t.data FROM _changes c "
+                "LEFT JOIN {} t ON t.id = c.id "
+                "WHERE c.class = ? AND c.seq > ? ORDER BY c.seq"
+                .format(self._table(s_class)),
+                (s_class, self._seqs.get(s_class, 0))).fetchall()
+        for seq, obj_id, data in rows:
+            if obj_id is None:
+                return None
+            if data is None:
+                result.append(('remove', obj_id, None))
+            else:
+                result.append(('save', obj_id, json.loads(
+                    data, object_pairs_hook=intern_keys)))
+            self._seqs[s_class] = seq
+        return result
+
+    def apply(self, s_class: str, changes: List[tuple]):
+        """ Upsert and delete the rows of changes in one transaction
+        """
+        with self._transaction():
+            table = self._table(s_class)
+            if self.multiprocess:
+                start = self._last_seq(s_class)
+            for op, obj_id, obj_text in changes:
+                if op == 'remove':
+                    self._db.execute("DELETE FROM {} WHERE id = ?"
+                                     .format(table), (obj_id,))
+                else:
+                    self._db.execute("INSERT OR REPLACE INTO {} "
+                                     "(id, data) VALUES (?, ?)"
+                                     .format(table), (obj_id, obj_text))
+                if self.multiprocess:
+                    self._db.execute("INSERT INTO _changes (class, id) "
+                                     "VALUES (?, ?)", (s_class, obj_id))
+            if not self.multiprocess:
+                return
+            last = self._last_seq(s_class)
+            self._db.execute("DELETE FROM _changes WHERE class = ? "
+                             "AND seq <= ?",
+                             (s_class, last - self.changes_log))
+            # our own changes don't need to be read back
+            if self._seqs.get(s_class, 0) == start:
+                self._seqs[s_class] = last
+
+    def journal_size(self, s_class: str) -> int:
+        """ Rows are updated in place: nothing accumulates
+        """
+        return 0
+
+    def compact(self, s_class: str) -> bool:
+        """ Rows are updated in place: there is nothing to fold
+        """
+        return False
+
+    def dump(self, s_class: str, objs_text: Iterable[Tuple[str, str]]):
+        """ Replace all rows of the class in one transaction
+        """
+        with self._transaction():
+            table = self._table(s_class)
+            self._db.execute("DELETE FROM {}".format(table))
+            self._db.executemany(
+                "INSERT INTO {} (id, data) VALUES (?, ?)".format(table),
+                objs_text)
+            if self.multiprocess:
+                self._db.execute("DELETE FROM _changes WHERE class = ?",
+                                 (s_class,))
+                self._db.execute("INSERT INTO _changes (class, id) "
+                                 "VALUES (?, NULL)", (s_class,))
+                self._seqs[s_class] = self._last_seq(s_class)
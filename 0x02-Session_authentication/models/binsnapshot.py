@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+""" Binary snapshot module
+
+A binary snapshot holds the records of one class as a MAGIC header
+followed by frames, each one a 4-byte length and a marshal-encoded
+(fields, timestamp positions, rows) tuple:
+- fields are the keys shared by the records of the frame
+- rows are (id, value, ...) tuples in fields order
+- timestamp fields holding TIMESTAMP_FORMAT text are stored as integer
+  seconds since the epoch, and turned back into the same text on read
+Frames hold at most FRAME_ROWS rows, so reading one only needs memory
+for its own rows.
+"""
+from datetime import datetime, timedelta
+from typing import BinaryIO, Iterable, Iterator, Tuple
+import marshal
+import struct
+
+MAGIC = b"BASEBIN1"
+FRAME_ROWS = 4096
+# marshal format read by every Python 3 version we support
+MARSHAL_VERSION = 4
+LENGTH = struct.Struct("<I")
+EPOCH = datetime(1970, 1, 1)
+ONE_SECOND = timedelta(seconds=1)
+# "%Y-%m-%dT" text of the days decoded so far, by day number
+DAYS = {}
+
+
+def encode_timestamp(value: object) -> object:
+    """ Return the seconds since the epoch of a TIMESTAMP_FORMAT text,
+    or value unchanged when it isn't one
+    """
+    if type(value) is not str or len(value) != 19 or value[10] != 'T':
+        return value
+    try:
+        return (datetime.fromisoformat(value) - EPOCH) // ONE_SECOND
+    except ValueError:
+        return value
+
+
+def decode_timestamp(seconds: int) -> str:
+    """ Return the TIMESTAMP_FORMAT text of seconds since the epoch
+    """
+    day, seconds = divmod(seconds, 86400)
+    prefix = DAYS.get(day)
+    if prefix is None:
+        prefix = (EPOCH + timedelta(days=day)).strftime("%Y-%m-%dT")
+        DAYS[day] = prefix
+    return "{}{:02d}:{:02d}:{:02d}".format(prefix, seconds // 3600,
+                                           seconds // 60 % 60, seconds % 60)
+
+
+def write_snapshot(f: BinaryIO, records: Iterable[Tuple[str, dict]],
+                   timestamps: Iterable[str] = ()):
+    """ Write (id, record) pairs to f, the timestamps fields as integers
+    """
+    f.write(MAGIC)
+    timestamps = set(timestamps)
+    frames = {}
+
+    def write_frame(fields: tuple, rows: list):
+        positions = tuple(i for i, name in enumerate(fields)
+                          if name in timestamps)
+        data = marshal.dumps((fields, positions, rows), MARSHAL_VERSION)
+        f.write(LENGTH.pack(len(data)))
+        f.write(data)
+
+    for obj_id, record in records:
+        fields = tuple(record)
+        row = [obj_id]
+        for name, value in record.items():
+            if name in timestamps:
+                value = encode_timestamp(value)
+            row.append(value)
+        rows = frames.setdefault(fields, [])
+        rows.append(tuple(row))
+        if len(rows) == FRAME_ROWS:
+            write_frame(fields, rows)
+            del frames[fields]
+    for fields, rows in frames.items():
+        write_frame(fields, rows)
+
+
+def read_snapshot(f: BinaryIO) -> Iterator[Tuple[str, dict]]:
+    """ Yield the (id, record) pairs of a snapshot written by
+    write_snapshot(), frame by frame
+    """
+    if f.read(len(MAGIC)) != MAGIC:
+        raise ValueError("Not a binary snapshot")
+    while True:
+        header = f.read(LENGTH.size)
+        if len(header) < LENGTH.size:
+            return
+        fields, positions, rows = marshal.loads(
+            f.read(LENGTH.unpack(header)[0]))
+        # records written together often share their timestamps
+        texts = {}
+        names = [(i + 1, fields[i]) for i in positions]
+        for row in rows:
+            record = dict(zip(fields, row[1:]))
+            for i, name in names:
+                value = row[i]
+                if type(value) is int:
+                    text = texts.get(value)
+                    if text is None:
+                        text = texts[value] = decode_timestamp(value)
+                    record[name] = text
+            yield row[0], record
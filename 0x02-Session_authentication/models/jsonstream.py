@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+""" JSON stream module
+"""
+from typing import IO, Iterator, Tuple
+import json
+import re
+import sys
+
+
+WHITESPACE = re.compile(r'[ \t\n\r]*')
+MEMBER_KEY = re.compile(r'[ \t\n\r]*"((?:[^"\\]|\\.)*)"[ \t\n\r]*:[ \t\n\r]*')
+SEPARATOR = re.compile(r'[ \t\n\r]*([,}])')
+
+
+def intern_keys(pairs: list) -> dict:
+    """ Build a JSON object sharing one copy of each key string
+    """
+    return {sys.intern(key): value for key, value in pairs}
+
+
+class JSONObjectReader():
+    """ Read the members of a top-level JSON object one by one,
+    without holding the whole document in memory
+    """
+
+    def __init__(self, f: IO[str], chunk_size: int = 1 << 16):
+        """ Initialize a reader on the text file f
+        """
+        self._f = f
+        self._chunk_size = chunk_size
+        self._decoder = json.JSONDecoder(object_pairs_hook=intern_keys)
+        self._buf = ""
+        self._pos = 0
+        self._eof = False
+
+    def _fill(self) -> bool:
+        """ Read the next chunk, dropping what was already consumed
+        """
+        if self._eof:
+            return False
+        chunk = self._f.read(self._chunk_size)
+        self._buf = self._buf[self._pos:] + chunk
+        self._pos = 0
+        if chunk == "":
+            self._eof = True
+        return not self._eof
+
+    def _peek(self) -> str:
+        """ Return the next non-blank character, or "" at the end
+        """
+        while True:
+            self._pos = WHITESPACE.match(self._buf, self._pos).end()
+            if self._pos < len(self._buf):
+                return self._buf[self._pos]
+            if not self._fill():
+                return ""
+
+    def _member(self) -> tuple:
+        """ Decode the next "key": value member and the separator after
+        it, or return None if the buffer doesn't hold all of it yet
+        """
+        key = MEMBER_KEY.match(self._buf, self._pos)
+        if key is None:
+            return None
+        try:
+            value, end = self._decoder.raw_decode(self._buf, key.end())
+        except ValueError:
+            return None
+        # a value ending with the buffer may be cut (numbers), so the
+        # separator must be there as well
+        separator = SEPARATOR.match(self._buf, end)
+        if separator is None:
+            return None
+        self._pos = separator.end()
+        name = key.group(1)
+        if '\\' in name:
+            name = json.loads('"{}"'.format(name))
+        return name, value, separator.group(1)
+
+    def __iter__(self) -> Iterator[Tuple[str, object]]:
+        """ Yield the (key, value) members of the object
+        """
+        if self._peek() != '{':
+            raise ValueError("Expecting '{' at the start of the document")
+        self._pos += 1
+        if self._peek() == '}':
+            self._pos += 1
+            return
+        while True:
+            member = self._member()
+            if member is None:
+                if not self._fill():
+                    raise ValueError("Unterminated JSON object")
+                continue
+            name, value, separator = member
+            yield name, value
+            if separator == '}':
+                return
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+""" Password hashing module
+
+Hashes are stored as "pbkdf2_sha256$<iterations>$<salt>$<digest>", salt
+and digest in hex, so that each one keeps the cost it was computed with.
+Plain SHA-256 hex digests of older records are still accepted, and
+needs_rehash() tells which hashes don't follow the current policy.
+"""
+from concurrent.futures import ThreadPoolExecutor
+from os import getenv
+from typing import List
+import hashlib
+import hmac
+import os
+
+SCHEME = 'pbkdf2_sha256'
+# PBKDF2 iterations of new hashes: calibrate_hash.py finds the most the
+# host can compute within a target login latency
+PASSWORD_ITERATIONS = int(getenv('PASSWORD_ITERATIONS', '100000'))
+SALT_SIZE = 16
+# threads hashing the passwords of a bulk creation: PBKDF2 releases the
+# GIL, so they keep as many cores busy
+HASH_WORKERS = int(getenv('PASSWORD_HASH_WORKERS', str(os.cpu_count() or 1)))
+
+
+def hash_password(pwd: str, iterations: int = None) -> str:
+    """ Return the salted hash of pwd, with its parameters
+    """
+    if iterations is None:
+        iterations = PASSWORD_ITERATIONS
+    salt = os.urandom(SALT_SIZE)
+    digest = hashlib.pbkdf2_hmac('sha256', pwd.encode(), salt, iterations)
+    return "{}${}${}${}".format(SCHEME, iterations, salt.hex(), digest.hex())
+
+
+def hash_passwords(pwds: List[str], iterations: int = None) -> List[str]:
+    """ Return the hashes of pwds in the same order, computed by up to
+    HASH_WORKERS threads at once
+    """
+    workers = min(HASH_WORKERS, len(pwds))
+    if workers <= 1:
+        return [hash_password(pwd, iterations) for pwd in pwds]
+    with ThreadPoolExecutor(workers) as executor:
+        return list(executor.map(
+            lambda pwd: hash_password(pwd, iterations), pwds))
+
+
+def parse(hashed: str) -> tuple:
+    """ Return the (scheme, iterations, salt, digest) of a hash, with
+    scheme 'sha256' and no iterations nor salt for the older ones, or
+    None when hashed isn't one
+    """
+    parts = hashed.split('$')
+    try:
+        if len(parts) == 1 and len(hashed) == 64:
+            return 'sha256', None, None, bytes.fromhex(hashed)
+        if len(parts) == 4 and parts[0] == SCHEME:
+            return (SCHEME, int(parts[1]), bytes.fromhex(parts[2]),
+                    bytes.fromhex(parts[3]))
+    except ValueError:
+        pass
+    return None
+
+
+def verify_password(pwd: str, hashed: str) -> bool:
+    """ Tell whether pwd matches hashed, in constant time
+    """
+    parsed = parse(hashed)
+    if parsed is None:
+        return False
+    scheme, iterations, salt, digest = parsed
+    if scheme == SCHEME:
+        computed = hashlib.pbkdf2_hmac('sha256', pwd.encode(), salt,
+                                       iterations)
+    else:
+        computed = hashlib.sha256(pwd.encode()).digest()
+    return hmac.compare_digest(computed, digest)
+
+
+def needs_rehash(hashed: str) -> bool:
+    """ Tell whether hashed was computed with other parameters than the
+    current ones, more or fewer iterations or an older scheme
+    """
+    parsed = parse(hashed)
+    return parsed is None or parsed[0] != SCHEME \
+        or parsed[1] != PASSWORD_ITERATIONS
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+""" Stats module
+"""
+from datetime import datetime
+from typing import Callable, Iterable
+from models.index import attribute_value
+
+
+def day_of(attribute: str) -> Callable[[object], str]:
+    """ Return a key function giving the "%Y-%m-%d" day of a timestamp
+    attribute, from an object or its raw record
+    """
+    def key(obj: object) -> str:
+        value = attribute_value(obj, attribute)
+        if isinstance(value, datetime):
+            return value.strftime("%Y-%m-%d")
+        if isinstance(value, str) and len(value) >= 10:
+            return value[:10]
+        return "unknown"
+    return key
+
+
+def any_set(*attributes: str) -> Callable[[object], bool]:
+    """ Return a key function telling whether any of the attributes of
+    an object, or of its raw record, is neither None nor empty
+    """
+    def key(obj: object) -> bool:
+        return any(attribute_value(obj, name) not in (None, "")
+                   for name in attributes)
+    return key
+
+
+class Counter():
+    """ Number of objects by the key a function computes from some of
+    their attributes, kept up to date like an index
+
+    Objects are only counted on the first read, so that loading a store
+    doesn't pay for statistics nobody asks for. The store lock is held
+    while counting and copying: the writers, holding it too, can't be
+    missed nor change the counts meanwhile.
+    """
+
+    def __init__(self, name: str, attributes: Iterable[str],
+                 key: Callable[[object], object]):
+        """ Initialize an empty counter of key(obj) values
+        """
+        self.name = name
+        self.attributes = tuple(attributes)
+        self.key = key
+        self._counts = {}
+        self._source = None
+
+    def build(self, store: dict):
+        """ Count all objects of a LazyStore, on the first read
+        """
+        self._counts = None
+        self._source = store
+
+    def counts(self) -> dict:
+        """ Return a copy of the number of objects by key
+        """
+        with self._source.lock:
+            if self._counts is None:
+                counts = {}
+                key = self.key
+                for _, obj in self._source.raw_items():
+                    value = key(obj)
+                    counts[value] = counts.get(value, 0) + 1
+                self._counts = counts
+            return dict(self._counts)
+
+    def add(self, obj_id: str, obj: object):
+        """ Count obj under its current key
+        """
+        counts = self._counts
+        if counts is None:
+            return
+        value = self.key(obj)
+        counts[value] = counts.get(value, 0) + 1
+
+    def discard(self, obj_id: str, obj: object):
+        """ Stop counting obj, using its current key
+        """
+        counts = self._counts
+        if counts is None:
+            return
+        value = self.key(obj)
+        left = counts.get(value, 0) - 1
+        if left > 0:
+            counts[value] = left
+        else:
+            counts.pop(value, None)
+
+    def add_many(self, pairs: Iterable[tuple]):
+        """ Count several (id, object) pairs
+        """
+        for obj_id, obj in pairs:
+            self.add(obj_id, obj)
+
+    def discard_many(self, pairs: Iterable[tuple]):
+        """ Stop counting several (id, object) pairs
+        """
+        for obj_id, obj in pairs:
+            self.discard(obj_id, obj)
+
+    def lookup(self, attributes: dict) -> None:
+        """ Counters don't find objects: always None
+        """
+        return None
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+""" User module
+"""
+from models.base import Base, COMPACT_OBJECTS
+from models.password import hash_password, hash_passwords, needs_rehash, \
+    verify_password
+from typing import List
+from models.stats import any_set, day_of
+
+
+class User(Base):
+    """ User class
+    """
+    __indexes__ = ('email',)
+    __ordered_indexes__ = ('email', 'created_at', 'updated_at')
+    __stats__ = {
+        'created_per_day': (('created_at',), day_of('created_at')),
+        'with_name': (('first_name', 'last_name'),
+                      any_set('first_name', 'last_name')),
+    }
+    if COMPACT_OBJECTS:
+        __slots__ = ('email', '_password', 'first_name', 'last_name')
+
+    def __init__(self, *args: list, **kwargs: dict):
+        """ Initialize a User instance
+        """
+        super().__init__(*args, **kwargs)
+        self.email = kwargs.get('email')
+        self._password = kwargs.get('_password')
+        self.first_name = kwargs.get('first_name')
+        self.last_name = kwargs.get('last_name')
+
+    @property
+    def password(self) -> str:
+        """ Getter of the password
+        """
+        return self._password
+
+    @password.setter
+    def password(self, pwd: str):
+        """ Setter of a new password: hash with salted PBKDF2-SHA256
+        """
+        if pwd is None or type(pwd) is not str:
+            self._password = None
+        else:
+            self._password = hash_password(pwd)
+
+    @classmethod
+    def set_passwords(cls, users: List['User'], pwds: List[str]):
+        """ Set the password of each of users to the one of pwds at the
+        same position, hashing them in parallel (see hash_passwords)
+        """
+        valid = [i for i, pwd in enumerate(pwds) if type(pwd) is str]
+        hashes = dict(zip(valid, hash_passwords([pwds[i] for i in valid])))
+        for i, user in enumerate(users):
+            user._password = hashes.get(i)
+
+    def is_valid_password(self, pwd: str) -> bool:
+        """ Validate a password
+        """
+        if pwd is None or type(pwd) is not str:
+            return False
+        if self.password is None:
+            return False
+        return verify_password(pwd, self.password)
+
+    def upgrade_password(self, pwd: str) -> bool:
+        """ Hash again the valid password pwd when its stored hash
+        doesn't follow the current policy, and save the user
+
+        Return whether the user was saved.
+        """
+        if self.password is None or not needs_rehash(self.password):
+            return False
+        self.password = pwd
+        self.save()
+        return True
+
+    def display_name(self) -> str:
+        """ Display User name based on email/first_name/last_name
+        """
+        if self.email is None and self.first_name is None \
+                and self.last_name is None:
+            return ""
+        if self.first_name is None and self.last_name is None:
+            return "{}".format(self.email)
+        if self.last_name is None:
+            return "{}".format(self.first_name)
+        if self.first_name is None:
+            return "{}".format(self.last_name)
+        else:
+            return "{} {}".format(self.first_name, self.last_name)
@@ -1,20 +1,20 @@
 #!/usr/bin/env python3
+""" UserSession module
 """
-UserSession module.
-"""
-from models.base import Base
-from sqlalchemy import Column, String, ForeignKey
-from sqlalchemy.orm import relationship
-from datetime import datetime
+from models.base import Base, COMPACT_OBJECTS
 
 
 class UserSession(Base):
-    """ UserSession class.
+    """ UserSession class: a Session ID of a user, kept in the file
+    store so that it outlives the process
     """
+    __indexes__ = ('session_id',)
+    if COMPACT_OBJECTS:
+        __slots__ = ('user_id', 'session_id')
 
-    __tablename__ = 'user_sessions'
-
-    user_id = Column(String(60), ForeignKey('users.id'), nullable=False)
-    session_id = Column(String(60), nullable=False, unique=True)
-    user = relationship('User', back_populates='user_sessions')
-    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    def __init__(self, *args: list, **kwargs: dict):
+        """ Initialize a UserSession instance
+        """
+        super().__init__(*args, **kwargs)
+        self.user_id = kwargs.get('user_id')
+        self.session_id = kwargs.get('session_id')
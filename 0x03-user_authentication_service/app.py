@@ -3,11 +3,20 @@
 """
 from auth import Auth
 from flask import Flask, jsonify, request, abort, redirect
+from hash_pool import HashingUnavailable
+from throttle import THROTTLE, keys_of
 
 app = Flask(__name__)
 AUTH = Auth()
 
 
+@app.errorhandler(HashingUnavailable)
+def hashingUnavailable(error) -> str:
+    """ Busy password hashing pool handler.
+    """
+    return jsonify({"message": "try again later"}), 503
+
+
 @app.route('/', methods=['GET'])
 def messageWelcome() -> str:
     """ Return a JSON payload of the form.
@@ -26,6 +35,8 @@ def registerUser() -> str:
         user = AUTH.register_user(email, password)
         return jsonify({"email": "{}".format(user.email),
                         "message": "user created"})
+    except HashingUnavailable:
+        raise
     except Exception:
         return jsonify({"message": "email already registered"}), 400
 
@@ -37,7 +48,14 @@ def logIn() -> str:
     email = request.form.get('email')
     password = request.form.get('password')
 
-    if not email or not password or not AUTH.valid_login(email, password):
+    if not email or not password:
+        abort(401)
+    # Refuse, before any lookup or hashing, an IP or email failing too often
+    keys = keys_of(request.remote_addr, email)
+    if not THROTTLE.allow(*keys):
+        return jsonify({"message": "too many attempts"}), 429
+    if not AUTH.valid_login(email, password):
+        THROTTLE.failure(*keys)
         abort(401)
 
     newSession = AUTH.create_session(email)
@@ -4,6 +4,7 @@
 
 
 import logging
+from os import getenv
 from typing import Union
 from uuid import uuid4
 
@@ -11,10 +12,14 @@ import bcrypt
 from sqlalchemy.orm.exc import NoResultFound
 
 from db import DB
+from hash_pool import HASH_POOL, HashingUnavailable
 from user import User
 
 logging.disable(logging.WARNING)
 
+# bcrypt work factor of new hashes, see calibrate_hash.py
+BCRYPT_ROUNDS = int(getenv("BCRYPT_ROUNDS", "12"))
+
 
 def _hash_password(password: str) -> bytes:
     """Hashes a password and returns bytes.
@@ -24,8 +29,44 @@ def _hash_password(password: str) -> bytes:
 
     Returns:
         bytes: The hashed password.
+
+    Raises:
+        HashingUnavailable: If the hashing pool is full or too slow.
+    """
+    return HASH_POOL.hashpw(password.encode("utf-8"),
+                            bcrypt.gensalt(BCRYPT_ROUNDS))
+
+
+async def _hash_password_async(password: str) -> bytes:
+    """Hashes a password without blocking the event loop.
+
+    Args:
+        password (str): The password to be hashed.
+
+    Returns:
+        bytes: The hashed password.
+
+    Raises:
+        HashingUnavailable: If the hashing pool is full or too slow.
     """
-    return bcrypt.hashpw(password.encode("utf-8"), bcrypt.gensalt())
+    return await HASH_POOL.hashpw_async(password.encode("utf-8"),
+                                        bcrypt.gensalt(BCRYPT_ROUNDS))
+
+
+def _needs_rehash(hashed_password: Union[bytes, str]) -> bool:
+    """Tells whether a hash was computed with another work factor.
+
+    Args:
+        hashed_password (bytes): A bcrypt hash, "$2b$<rounds>$...".
+
+    Returns:
+        bool: True if its rounds aren't BCRYPT_ROUNDS.
+    """
+    if isinstance(hashed_password, str):
+        hashed_password = hashed_password.encode("utf-8")
+    parts = hashed_password.split(b"$")
+    return len(parts) < 4 or not parts[2].isdigit() \
+        or int(parts[2]) != BCRYPT_ROUNDS
 
 
 def _generate_uuid() -> str:
@@ -81,20 +122,42 @@ class Auth:
         Returns:
             bool: True if the email and password match a registered user,
             False otherwise.
+
+        Raises:
+            HashingUnavailable: If the hashing pool is full or too slow.
         """
         try:
             # Locate the user by email
             user = self._db.find_user_by(email=email)
             if user is not None:
-                # Check if the password matches using bcrypt
+                # Check if the password matches using bcrypt, on the pool
                 password_bytes = password.encode('utf-8')
                 hashed_password = user.hashed_password
-                if bcrypt.checkpw(password_bytes, hashed_password):
+                if HASH_POOL.checkpw(password_bytes, hashed_password):
+                    # Rehash with the current work factor if it changed
+                    if _needs_rehash(hashed_password):
+                        self._upgrade_password(user.id, password)
                     return True
         except NoResultFound:
             return False
         return False
 
+    def _upgrade_password(self, user_id: int, password: str) -> None:
+        """Stores a new hash of a password just validated.
+
+        The old hash stays valid when the pool is busy: the upgrade is
+        tried again on the next login.
+
+        Args:
+            user_id (int): The ID of the user.
+            password (str): The valid password of the user.
+        """
+        try:
+            hashed_password = _hash_password(password)
+        except HashingUnavailable:
+            return
+        self._db.update_user(user_id, hashed_password=hashed_password)
+
     def create_session(self, email: str) -> str:
         """Creates a session and returns the session ID as a string.
 
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""Module running the password hashing on a pool of processes.
+"""
+import asyncio
+import os
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from typing import Callable
+
+import bcrypt
+
+# processes hashing in parallel, one per core by default
+HASH_WORKERS = int(os.getenv("HASH_WORKERS", str(os.cpu_count() or 1)))
+# hashes queued or running at once, beyond which new ones are refused
+HASH_QUEUE_SIZE = int(os.getenv("HASH_QUEUE_SIZE", str(HASH_WORKERS * 8)))
+# seconds a caller waits for its hash before giving up
+HASH_TIMEOUT = float(os.getenv("HASH_TIMEOUT", "5"))
+
+
+class HashingUnavailable(Exception):
+    """Raised when a hash can't be computed in time: the queue is full
+    or the pool took longer than its timeout.
+    """
+
+
+class HashPool:
+    """Bounded pool of processes running bcrypt off the request threads.
+
+    The processes are started on first use. At most queue_size hashes
+    are queued or running at once: a submission beyond that fails right
+    away with HashingUnavailable rather than making every login wait.
+    """
+
+    def __init__(self, workers: int = HASH_WORKERS,
+                 queue_size: int = HASH_QUEUE_SIZE,
+                 timeout: float = HASH_TIMEOUT) -> None:
+        """Initialize a pool of worker processes, not started yet.
+        """
+        self.workers = workers
+        self.timeout = timeout
+        self._slots = threading.BoundedSemaphore(queue_size)
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        """Return the process pool, starting it on first use.
+        """
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(self.workers)
+            return self._executor
+
+    def submit(self, fn: Callable, *args) -> Future:
+        """Queue fn(*args) on the pool and return its future.
+
+        Raises:
+            HashingUnavailable: If the queue is full.
+        """
+        if not self._slots.acquire(blocking=False):
+            raise HashingUnavailable("Too many passwords being hashed")
+        try:
+            future = self._get_executor().submit(fn, *args)
+        except BaseException:
+            self._slots.release()
+            raise
+        # the slot is only given back once a worker is done with the hash,
+        # even if its caller stopped waiting
+        future.add_done_callback(lambda _: self._slots.release())
+        return future
+
+    def run(self, fn: Callable, *args):
+        """Return fn(*args), computed on the pool, for the sync callers.
+
+        Raises:
+            HashingUnavailable: If the queue is full or the timeout expires.
+        """
+        future = self.submit(fn, *args)
+        try:
+            return future.result(self.timeout)
+        except FutureTimeoutError:
+            future.cancel()
+            raise HashingUnavailable("Password hashing timed out")
+
+    async def run_async(self, fn: Callable, *args):
+        """Return fn(*args), computed on the pool, for the async callers.
+
+        Raises:
+            HashingUnavailable: If the queue is full or the timeout expires.
+        """
+        future = self.submit(fn, *args)
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(future),
+                                          self.timeout)
+        except asyncio.TimeoutError:
+            future.cancel()
+            raise HashingUnavailable("Password hashing timed out")
+
+    def hashpw(self, password: bytes, salt: bytes) -> bytes:
+        """Return bcrypt.hashpw(password, salt), computed on the pool.
+        """
+        return self.run(bcrypt.hashpw, password, salt)
+
+    def checkpw(self, password: bytes, hashed_password: bytes) -> bool:
+        """Return bcrypt.checkpw(password, hashed_password), computed on
+        the pool.
+        """
+        return self.run(bcrypt.checkpw, password, hashed_password)
+
+    async def hashpw_async(self, password: bytes, salt: bytes) -> bytes:
+        """Return bcrypt.hashpw(password, salt) without blocking the loop.
+        """
+        return await self.run_async(bcrypt.hashpw, password, salt)
+
+    async def checkpw_async(self, password: bytes,
+                            hashed_password: bytes) -> bool:
+        """Return bcrypt.checkpw(password, hashed_password) without
+        blocking the loop.
+        """
+        return await self.run_async(bcrypt.checkpw, password, hashed_password)
+
+    def shutdown(self) -> None:
+        """Stop the worker processes, waiting for the running hashes.
+        """
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown()
+                self._executor = None
+
+
+HASH_POOL = HashPool()
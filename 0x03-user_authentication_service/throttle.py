@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+""" Throttling of the failed authentication attempts, by client IP and
+by email
+"""
+from collections import OrderedDict
+from os import getenv
+from threading import Lock
+import time
+
+# failed attempts allowed in a burst for one IP or email, then one more
+# every 1 / THROTTLE_RATE seconds
+THROTTLE_BURST = float(getenv('THROTTLE_BURST', '10'))
+THROTTLE_RATE = float(getenv('THROTTLE_RATE', '0.1'))
+# IPs and emails tracked at most, least recently seen dropped first
+THROTTLE_MAX_KEYS = int(getenv('THROTTLE_MAX_KEYS', '100000'))
+
+
+class Throttle():
+    """ Token buckets of failed attempts, one per key ("ip:...",
+    "email:...")
+
+    allow() is asked before looking a user up or hashing a password and
+    refuses while any key has no token left; failure() takes a token
+    from each key of a failed attempt. A bucket is refilled at rate
+    tokens per second up to burst: once full it is the same as no
+    bucket, so buckets idle for that long are dropped, and at most
+    max_keys are kept, the least recently seen first to go.
+    """
+
+    def __init__(self, burst: float = THROTTLE_BURST,
+                 rate: float = THROTTLE_RATE,
+                 max_keys: int = THROTTLE_MAX_KEYS):
+        """ Initialize a throttle without any bucket
+        """
+        self.burst = burst
+        self.rate = rate
+        self.max_keys = max_keys
+        # [tokens, time of the last update] by key, least recent first
+        self._buckets = OrderedDict()
+        self._lock = Lock()
+        self.allowed = 0
+        self.rejected = 0
+        self.failures = 0
+        self.evictions = 0
+
+    def _tokens(self, bucket: list, now: float) -> float:
+        """ Return the tokens of bucket refilled until now
+        """
+        return min(self.burst, bucket[0] + (now - bucket[1]) * self.rate)
+
+    def _evict(self, now: float):
+        """ Drop the buckets full again, and the least recent ones beyond
+        max_keys, oldest first
+        """
+        idle = self.burst / self.rate if self.rate > 0 else float('inf')
+        buckets = self._buckets
+        while buckets:
+            key, bucket = next(iter(buckets.items()))
+            if len(buckets) <= self.max_keys and now - bucket[1] < idle:
+                break
+            del buckets[key]
+            self.evictions += 1
+
+    def allow(self, *keys: str) -> bool:
+        """ Tell whether an attempt of keys may run, counting it
+        """
+        now = time.monotonic()
+        with self._lock:
+            for key in keys:
+                bucket = self._buckets.get(key)
+                if bucket is not None and self._tokens(bucket, now) < 1:
+                    self.rejected += 1
+                    return False
+            self.allowed += 1
+            return True
+
+    def failure(self, *keys: str):
+        """ Take a token from each key of a failed attempt
+        """
+        now = time.monotonic()
+        with self._lock:
+            self.failures += 1
+            for key in keys:
+                bucket = self._buckets.pop(key, None)
+                tokens = self.burst if bucket is None \
+                    else self._tokens(bucket, now)
+                self._buckets[key] = [max(tokens - 1, 0), now]
+            self._evict(now)
+
+    def stats(self) -> dict:
+        """ Return the attempts allowed, the ones rejected without any
+        lookup nor hashing, the failures and the buckets kept
+        """
+        with self._lock:
+            return {"allowed": self.allowed,
+                    "rejected": self.rejected,
+                    "failures": self.failures,
+                    "evictions": self.evictions,
+                    "keys": len(self._buckets)}
+
+
+def keys_of(ip: str, email: str) -> tuple:
+    """ Return the throttle keys of an attempt from ip for email
+    """
+    keys = ("ip:{}".format(ip),)
+    if email:
+        keys += ("email:{}".format(email.strip().lower()),)
+    return keys
+
+
+THROTTLE = Throttle()
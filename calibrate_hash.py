@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+""" Picks the strongest password hashing cost this host computes within
+a target latency, and prints the setting to export:
+- PASSWORD_ITERATIONS, the PBKDF2-SHA256 iterations of the 0x01 and
+  0x02 User passwords
+- BCRYPT_ROUNDS, the bcrypt work factor of encrypt_password.py and of
+  the 0x03 user authentication service
+Hashes made with another cost are rehashed on the next successful login.
+
+Usage: ./calibrate_hash.py [pbkdf2|bcrypt] [target ms, default 250]
+"""
+import hashlib
+import os
+import sys
+import time
+
+SAMPLES = 5
+MIN_ITERATIONS = 10000
+MAX_BCRYPT_ROUNDS = 20
+
+
+def median_ms(hash_once) -> float:
+    """ Return the median time in ms of SAMPLES calls of hash_once
+    """
+    times = []
+    for _ in range(SAMPLES):
+        start = time.perf_counter()
+        hash_once()
+        times.append((time.perf_counter() - start) * 1000)
+    times.sort()
+    return times[len(times) // 2]
+
+
+def pbkdf2_ms(iterations: int) -> float:
+    """ Return the time in ms of one PBKDF2-SHA256 hash
+    """
+    salt = os.urandom(16)
+    return median_ms(lambda: hashlib.pbkdf2_hmac(
+        'sha256', b'calibration password', salt, iterations))
+
+
+def calibrate_pbkdf2(target_ms: float) -> tuple:
+    """ Return the (iterations, ms) of the most PBKDF2 iterations, in
+    thousands, hashing within target_ms
+    """
+    # the time grows linearly with the iterations: measure one point,
+    # extrapolate, then step down until the measure fits
+    per_iteration = pbkdf2_ms(MIN_ITERATIONS) / MIN_ITERATIONS
+    iterations = max(MIN_ITERATIONS,
+                     int(target_ms / per_iteration) // 1000 * 1000)
+    ms = pbkdf2_ms(iterations)
+    while ms > target_ms and iterations > MIN_ITERATIONS:
+        iterations = max(MIN_ITERATIONS, int(iterations * 0.9) // 1000 * 1000)
+        ms = pbkdf2_ms(iterations)
+    return iterations, ms
+
+
+def calibrate_bcrypt(target_ms: float) -> tuple:
+    """ Return the (rounds, ms) of the highest bcrypt work factor hashing
+    within target_ms, 4 at least
+    """
+    import bcrypt
+
+    best = None
+    for rounds in range(4, MAX_BCRYPT_ROUNDS + 1):
+        salt = bcrypt.gensalt(rounds)
+        ms = median_ms(lambda: bcrypt.hashpw(b'calibration password', salt))
+        if best is not None and ms > target_ms:
+            break
+        best = (rounds, ms)
+    return best
+
+
+if __name__ == "__main__":
+    scheme = sys.argv[1] if len(sys.argv) > 1 else "pbkdf2"
+    target_ms = float(sys.argv[2]) if len(sys.argv) > 2 else 250
+    if scheme == "pbkdf2":
+        name, (cost, ms) = "PASSWORD_ITERATIONS", calibrate_pbkdf2(target_ms)
+    elif scheme == "bcrypt":
+        name, (cost, ms) = "BCRYPT_ROUNDS", calibrate_bcrypt(target_ms)
+    else:
+        sys.exit("Unknown scheme {}: pbkdf2 or bcrypt".format(scheme))
+    print("# {} ms per hash, target {} ms".format(round(ms, 1), target_ms))
+    print("export {}={}".format(name, cost))
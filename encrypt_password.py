@@ -1,11 +1,16 @@
 #!/usr/bin/env python3
 """ Returns a salted, hashed password, byte in string """
+from os import getenv
 import bcrypt
 
+# bcrypt work factor of new hashes, see calibrate_hash.py
+BCRYPT_ROUNDS = int(getenv('BCRYPT_ROUNDS', '12'))
+
 
 def hash_password(password: str) -> bytes:
     """ Returns byte string password """
-    return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt())
+    return bcrypt.hashpw(password.encode('utf-8'),
+                         bcrypt.gensalt(BCRYPT_ROUNDS))
 
 
 def is_valid(hashed_password: bytes, password: str) -> bool:
@@ -13,3 +18,14 @@ def is_valid(hashed_password: bytes, password: str) -> bool:
     matched hashed_password
     """
     return bcrypt.checkpw(password.encode('utf-8'), hashed_password)
+
+
+def needs_rehash(hashed_password: bytes) -> bool:
+    """ Tells whether hashed_password, "$2b$<rounds>$...", was computed
+    with another work factor than BCRYPT_ROUNDS
+    """
+    if isinstance(hashed_password, str):
+        hashed_password = hashed_password.encode('utf-8')
+    parts = hashed_password.split(b'$')
+    return len(parts) < 4 or not parts[2].isdigit() \
+        or int(parts[2]) != BCRYPT_ROUNDS